@@ -4,16 +4,31 @@
 # Simulates natural keyboard typing into any focused input field.
 # =================================================================
 
+import argparse
+import asyncio
+import codecs
+import cProfile
+import hashlib
+import io
+import itertools
 import json
 import math
+import mmap
+import multiprocessing
 import os
 import platform
+import pstats
 import random
 import re
+import secrets
+import struct
 import sys
 import threading
 import time
 import tkinter as tk
+import tracemalloc
+import zlib
+from array import array
 from tkinter import ttk, font as tkfont, messagebox, filedialog
 
 try:
@@ -27,6 +42,12 @@ PRESETS_FILE = os.path.join(APP_DIR, "presets.json")
 DRAFT_FILE = os.path.join(APP_DIR, ".draft.json")
 HISTORY_FILE = os.path.join(APP_DIR, ".history.json")
 SETTINGS_FILE = os.path.join(APP_DIR, ".settings.json")
+PLAN_CACHE_DIR = os.path.join(APP_DIR, ".plancache")
+BIGRAM_FILE = os.path.join(APP_DIR, ".bigrams.bin")
+CHECKPOINT_FILE = os.path.join(APP_DIR, ".checkpoint.json")
+QUEUE_FILE = os.path.join(APP_DIR, ".queue.json")
+TRACE_DIR = os.path.join(APP_DIR, "traces")
+PROFILE_DIR = os.path.join(APP_DIR, "profiles")
 
 
 # ==================================================================
@@ -44,7 +65,13 @@ if SYSTEM == "Windows":
     _VC = 0x11       # Ctrl
     _VM = 0x12       # Alt
     _VR = 0x0D       # Enter
+    _VV = 0x56       # V
     _VF9 = 0x78      # F9
+    _WM_HOTKEY = 0x0312
+    _WM_QUIT = 0x0012
+    _MOD_NOREPEAT = 0x4000
+
+    _k32 = ctypes.windll.kernel32
 
     class _KBI(ctypes.Structure):
         """KEYBDINPUT"""
@@ -75,76 +102,997 @@ if SYSTEM == "Windows":
         _fields_ = [("type", ctypes.c_ulong), ("u", _U)]
 
 
+# ==================================================================
+# X11 XTest (Linux)
+# ==================================================================
+if SYSTEM == "Linux":
+    import ctypes
+    import ctypes.util
+
+    def _load_xlib():
+        """Load libX11 + libXtst and declare the prototypes we use."""
+        x11 = ctypes.cdll.LoadLibrary(
+            ctypes.util.find_library("X11") or "libX11.so.6")
+        xtst = ctypes.cdll.LoadLibrary(
+            ctypes.util.find_library("Xtst") or "libXtst.so.6")
+        vp, ci, cu = ctypes.c_void_p, ctypes.c_int, ctypes.c_ulong
+        x11.XOpenDisplay.restype = vp
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XCloseDisplay.argtypes = [vp]
+        x11.XDisplayKeycodes.argtypes = [vp, ctypes.POINTER(ci),
+                                         ctypes.POINTER(ci)]
+        x11.XGetKeyboardMapping.restype = ctypes.POINTER(cu)
+        x11.XGetKeyboardMapping.argtypes = [vp, ctypes.c_ubyte, ci,
+                                            ctypes.POINTER(ci)]
+        x11.XChangeKeyboardMapping.argtypes = [vp, ci, ci,
+                                               ctypes.POINTER(cu), ci]
+        x11.XKeysymToKeycode.restype = ctypes.c_ubyte
+        x11.XKeysymToKeycode.argtypes = [vp, cu]
+        x11.XQueryKeymap.argtypes = [vp, ctypes.c_char_p]
+        x11.XFree.argtypes = [vp]
+        x11.XFlush.argtypes = [vp]
+        x11.XSync.argtypes = [vp, ci]
+        xtst.XTestFakeKeyEvent.argtypes = [vp, ctypes.c_uint, ci, cu]
+        return x11, xtst
+
+
+# ==================================================================
+# Keystroke Plans
+# ==================================================================
+MOD_SHIFT = 1
+MOD_CTRL = 2
+MOD_ALT = 4
+
+
+class KeystrokePlan:
+    """Text compiled once into flat (vk, scan, flags) key events.
+
+    The events for character i are the slice offsets[i]:offsets[i + 1]
+    of the three parallel arrays; mods[i] is the modifier mask (MOD_*)
+    that must be held while they are sent.  Backends without native key
+    events leave the arrays empty and replay from ``text``.
+    """
+
+    def __init__(self, text="", layout=""):
+        self.text = text
+        self.layout = layout
+        self.vk = array("H")
+        self.scan = array("H")
+        self.flags = array("H")
+        self.offsets = array("I", [0])
+        self.mods = array("B")
+        self.unmapped = 0
+
+    def __len__(self):
+        return len(self.text)
+
+    @property
+    def events(self):
+        return len(self.vk)
+
+
+# ==================================================================
+# Delay Schedules
+# ==================================================================
+class DelayEngine:
+    """Build whole per-character delay schedules in one table-driven pass.
+
+    schedule(text) returns an array('d') where entry i is the pause after
+    character i.  Burst state carries over between calls, and a fixed
+    seed makes every schedule (and so every session) reproducible.
+    """
+
+    # Human mode: extra pause after a character, as (lo, hi) multiples of
+    # the base delay.
+    HUMAN_EXTRA = {
+        ".": (2, 5), "!": (2, 5), "?": (2, 5),
+        ",": (0.5, 2), ";": (0.5, 2), ":": (0.5, 2),
+        "\n": (1, 3),
+        " ": (0, 0.5),
+    }
+    BURST_RUN = (3, 8)       # chars per burst
+    BURST_FAST = 0.3         # delay inside a burst, x base
+    BURST_PAUSE = (3, 7)     # pause after a burst, x base
+
+    def __init__(self, mode, base, randomness=0.0, seed=None, bigrams=None):
+        if mode == "learned" and not (bigrams and bigrams.samples):
+            mode = "human"   # nothing recorded yet
+        self.mode = mode
+        self.base = base
+        self.randomness = randomness
+        self.bigrams = bigrams
+        self.rng = random.Random(seed)
+        self._burst_next = self.rng.randint(*self.BURST_RUN) - 1
+
+    def schedule(self, text):
+        n = len(text)
+        base = self.base
+        if self.mode == "learned":
+            bg = self.bigrams
+            codes = bg.codes(text)
+            k, mu, sd = bg.K, bg.mu, bg.sd
+            scale = base / bg.avg
+            gauss = self.rng.gauss
+            out = array("d", [max(0.25, gauss(1.0, sd[i] / mu[i])) * mu[i]
+                              for i in [a * k + b for a, b in
+                                        zip(codes, codes[1:])]])
+            if n:
+                out.append(bg.row_mu[codes[-1]])
+            for i in range(len(out)):
+                out[i] *= scale
+            return out
+        if self.mode == "human":
+            rnd = self.rng.random
+            var = base * self.randomness
+            lo = base - var
+            span = 2.0 * var
+            out = array("d", [lo + span * rnd() for _ in range(n)])
+            for ch, (x_lo, x_hi) in self.HUMAN_EXTRA.items():
+                a, b = base * x_lo, base * (x_hi - x_lo)
+                i = text.find(ch)
+                while i != -1:
+                    out[i] += a + b * rnd()
+                    i = text.find(ch, i + 1)
+            return out
+        if self.mode == "burst":
+            out = array("d", [base * self.BURST_FAST]) * n
+            uniform, randint = self.rng.uniform, self.rng.randint
+            i = self._burst_next
+            while i < n:
+                out[i] = base * uniform(*self.BURST_PAUSE)
+                i += randint(*self.BURST_RUN)
+            self._burst_next = i - n
+            return out
+        return array("d", [base]) * n
+
+    def expected_total(self, text):
+        """Mean total of schedule(text) for unseeded runs."""
+        n = len(text)
+        base = self.base
+        if self.mode == "learned":
+            bg = self.bigrams
+            codes = bg.codes(text)
+            k, mu = bg.K, bg.mu
+            total = math.fsum(mu[a * k + b] for a, b in zip(codes, codes[1:]))
+            if n:
+                total += bg.row_mu[codes[-1]]
+            return total * base / bg.avg
+        if self.mode == "human":
+            extra = sum(text.count(ch) * (lo + hi) / 2.0
+                        for ch, (lo, hi) in self.HUMAN_EXTRA.items())
+            return base * (n + extra)
+        if self.mode == "burst":
+            run = sum(self.BURST_RUN) / 2.0
+            pause = sum(self.BURST_PAUSE) / 2.0
+            return base * n * (self.BURST_FAST * (run - 1) + pause) / run
+        return base * n
+
+
+class BigramTiming:
+    """Learned inter-key timing, recorded from the user's own typing.
+
+    Characters fold into K classes (letters case-insensitive, digits,
+    space, newline, punctuation groups, other) and intervals are kept
+    per (previous, next) class pair with Welford's running mean/variance
+    in flat arrays.  mu/sd are lookup tables with sparse cells already
+    filled from coarser statistics, so sampling is two array reads.
+    """
+
+    K = 64
+    OTHER = 63           # = ord("?"), what non-ASCII encodes to below
+    MIN_SAMPLES = 3
+    MAX_GAP = 1.5        # longer gaps are thinking pauses, not rhythm
+    MAGIC = b"AWB1"
+
+    _TABLE = {}
+    for _c in range(128):
+        _ch = chr(_c).lower()
+        if "a" <= _ch <= "z":
+            _TABLE[_c] = ord(_ch) - 97
+        elif "0" <= _ch <= "9":
+            _TABLE[_c] = 26 + ord(_ch) - 48
+        elif _ch in " \t":
+            _TABLE[_c] = 36
+        elif _ch == "\n":
+            _TABLE[_c] = 37
+        elif _ch in ".!?":
+            _TABLE[_c] = 38
+        elif _ch in ",;:":
+            _TABLE[_c] = 39
+        else:
+            _TABLE[_c] = 40 if _c >= 32 else OTHER
+    del _c, _ch
+
+    def __init__(self):
+        self._path = BIGRAM_FILE
+        cells = self.K * self.K
+        self.count = array("I", [0]) * cells
+        self.mean = array("d", [0.0]) * cells
+        self.m2 = array("d", [0.0]) * cells
+        self._load()
+        self._build()
+
+    @classmethod
+    def codes(cls, text):
+        """Class code per character, as bytes."""
+        return text.translate(cls._TABLE).encode("ascii", "replace")
+
+    @property
+    def samples(self):
+        return sum(self.count)
+
+    def add(self, prev, ch, interval):
+        if interval <= 0 or interval > self.MAX_GAP:
+            return
+        codes = self.codes(prev + ch)
+        i = codes[0] * self.K + codes[1]
+        n = self.count[i] + 1
+        d = interval - self.mean[i]
+        self.count[i] = n
+        self.mean[i] += d / n
+        self.m2[i] += d * (interval - self.mean[i])
+
+    def _build(self):
+        """Fill the mu/sd/row_mu lookup tables used for sampling."""
+        k = self.K
+        count, mean, m2 = self.count, self.mean, self.m2
+        total = self.samples
+        self.avg = (math.fsum(mean[i] * count[i] for i in range(k * k))
+                    / total) if total else 0.1
+        col = []
+        row = []
+        for j in range(k):
+            cn = sum(count[a * k + j] for a in range(k))
+            col.append(math.fsum(mean[a * k + j] * count[a * k + j]
+                                 for a in range(k)) / cn if cn else self.avg)
+            rn = sum(count[j * k:(j + 1) * k])
+            row.append(math.fsum(mean[j * k + b] * count[j * k + b]
+                                 for b in range(k)) / rn if rn else self.avg)
+        self.mu = array("d", [0.0]) * (k * k)
+        self.sd = array("d", [0.0]) * (k * k)
+        for i in range(k * k):
+            n = count[i]
+            if n >= self.MIN_SAMPLES:
+                self.mu[i] = mean[i]
+                self.sd[i] = math.sqrt(m2[i] / (n - 1))
+            else:
+                self.mu[i] = col[i % k]
+                self.sd[i] = col[i % k] * 0.3
+        self.row_mu = array("d", row)
+
+    def _load(self):
+        try:
+            if os.path.exists(self._path):
+                with open(self._path, "rb") as fh:
+                    if fh.read(4) != self.MAGIC:
+                        return
+                    for arr in (self.count, self.mean, self.m2):
+                        tmp = array(arr.typecode)
+                        tmp.fromfile(fh, len(arr))
+                        arr[:] = tmp
+        except Exception:
+            self.clear()
+
+    def save(self):
+        self._build()
+        try:
+            with open(self._path, "wb") as fh:
+                fh.write(self.MAGIC)
+                for arr in (self.count, self.mean, self.m2):
+                    arr.tofile(fh)
+        except Exception:
+            pass
+
+    def clear(self):
+        cells = self.K * self.K
+        self.count = array("I", [0]) * cells
+        self.mean = array("d", [0.0]) * cells
+        self.m2 = array("d", [0.0]) * cells
+        self._build()
+
+
+# ==================================================================
+# Text Sources
+# ==================================================================
+def split_lines(blocks):
+    """Split a stream of text blocks into lines, like str.split("\\n")."""
+    tail = []
+    for block in blocks:
+        parts = block.split("\n")
+        tail.append(parts[0])
+        if len(parts) > 1:
+            yield "".join(tail)
+            yield from parts[1:-1]
+            tail = [parts[-1]]
+    yield "".join(tail)
+
+
+def join_lines(lines, size):
+    """Join lines with "\\n" again, yielding blocks of about size chars."""
+    buf = []
+    n = 0
+    sep = ""
+    for line in lines:
+        buf.append(sep)
+        buf.append(line)
+        sep = "\n"
+        n += len(line) + 1
+        if n >= size:
+            yield "".join(buf)
+            buf = []
+            n = 0
+    out = "".join(buf)
+    if out:
+        yield out
+
+
+def trim_lines(lines):
+    """Line stage: drop trailing whitespace."""
+    for line in lines:
+        yield line.rstrip()
+
+
+def skip_empty_lines(lines):
+    """Line stage: drop blank lines."""
+    for line in lines:
+        if line.strip():
+            yield line
+
+
+class TextSource:
+    """Editor text fed to the typing loop in blocks.
+
+    blocks() slices the text lazily and passes it through the line
+    stages (generators taking and yielding lines, e.g. trim_lines), so
+    typing can start at once and no filtered copy of the whole text is
+    built.  size and pos are in source units -- chars here, bytes for
+    FileSource -- and pos is how far the last block handed out reached.
+    """
+
+    BLOCK = 1 << 16
+
+    def __init__(self, text, stages=()):
+        self.text = text
+        self.name = "editor"
+        self.stages = stages
+        end = len(text)
+        while end and text[end - 1] == "\n":
+            end -= 1
+        self.size = end     # trailing newlines are never typed
+        self.pos = 0
+
+    def blocks(self):
+        blocks = self._raw()
+        if not self.stages:
+            return blocks
+        lines = split_lines(blocks)
+        for stage in self.stages:
+            lines = stage(lines)
+        return join_lines(lines, self.BLOCK)
+
+    def digest(self):
+        """Fingerprint of the text and stages, to validate a resume."""
+        h = hashlib.sha1()
+        for stage in self.stages:
+            h.update(stage.__name__.encode() + b"\0")
+        for block in self._raw():
+            h.update(block.encode("utf-8", "surrogatepass"))
+        return h.hexdigest()
+
+    def _raw(self):
+        self.pos = 0
+        while self.pos < self.size:
+            start = self.pos
+            self.pos = min(start + self.BLOCK, self.size)
+            yield self.text[start:self.pos]
+
+
+class FileSource(TextSource):
+    """A UTF-8 text file typed straight from disk.
+
+    The file is memory-mapped and decoded block by block, so memory use
+    does not grow with the file size.
+    """
+
+    def __init__(self, path, stages=()):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.stages = stages
+        self.size = os.path.getsize(path)
+        self.pos = 0
+
+    def digest(self):
+        """Fingerprint of the file identity (path, size, mtime), which is
+        cheap even for huge files."""
+        st = os.stat(self.path)
+        ident = [os.path.abspath(self.path), st.st_size, st.st_mtime_ns]
+        ident += [stage.__name__ for stage in self.stages]
+        return hashlib.sha1(repr(ident).encode("utf-8")).hexdigest()
+
+    def _raw(self):
+        """Yield decoded blocks with newlines normalised to \\n.
+
+        Trailing newlines at the end of the file are dropped, like the
+        editor does with its text.
+        """
+        self.pos = 0
+        if not self.size:
+            return
+        dec = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder("utf-8-sig")("replace"), True)
+        held = ""
+        with open(self.path, "rb") as fh, \
+                mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            while self.pos < size:
+                end = min(self.pos + self.BLOCK, size)
+                piece = dec.decode(mm[self.pos:end], end >= size)
+                self.pos = end
+                body = piece.rstrip("\n")
+                if body:
+                    yield held + body
+                    held = piece[len(body):]
+                else:
+                    held += piece
+
+
+# ==================================================================
+# Typing Scheduler
+# ==================================================================
+class TypingScheduler:
+    """Pace keystrokes on absolute perf_counter deadlines.
+
+    Each wait targets start + sum(delays) rather than now + delay, so
+    time spent in the backend and in UI callbacks is absorbed instead of
+    adding drift.  Long waits block on the stop event so Stop/F9 wake
+    them at once; the last SLICE seconds sleep and the final SPIN
+    seconds busy-wait for sub-millisecond accuracy.
+    """
+
+    SPIN = 0.002
+    SLICE = 0.02     # Event.wait timeouts can be timer-tick coarse
+    MAX_LAG = 0.25   # further behind than this, restart from now
+
+    def __init__(self, stop_event=None):
+        self._stop = stop_event or threading.Event()
+        now = time.perf_counter()
+        self.t0 = now
+        self._deadline = now
+        self.planned = 0.0   # sum of requested delays
+        self.paused = 0.0    # time excluded by resync()
+
+    def wait(self, delay):
+        self.planned += delay
+        self._deadline += delay
+        now = time.perf_counter()
+        if now - self._deadline > self.MAX_LAG:
+            # Backend stall: don't fire a burst of keys to catch up
+            self._deadline = now
+            return
+        remaining = self._deadline - now
+        if remaining > self.SLICE:
+            if self._stop.wait(remaining - self.SLICE):
+                return
+            remaining = self._deadline - time.perf_counter()
+        if remaining > self.SPIN:
+            time.sleep(remaining - self.SPIN)
+        stop = self._stop
+        while time.perf_counter() < self._deadline:
+            if stop.is_set():
+                return
+
+    def resync(self, since):
+        """Restart deadlines after a pause that began at ``since``."""
+        now = time.perf_counter()
+        self.paused += now - since
+        self._deadline = now
+
+    @property
+    def due(self):
+        """When the next keystroke is due, in seconds since t0."""
+        return self._deadline - self.t0
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.t0 - self.paused
+
+    def rate_error(self):
+        """Achieved rate relative to the target rate, minus one."""
+        if self.planned <= 0:
+            return 0.0
+        return self.planned / self.elapsed - 1.0
+
+
+class RateController:
+    """Closed-loop pacing toward a target rate (Target WPM).
+
+    Scheduled delays are multiplied by ``scale``.  Every STEP keystrokes
+    the rate achieved over the last WINDOW keystrokes and over the whole
+    run is compared with the target and the scale is nudged in log
+    space, so backend cost and loop overhead are corrected for while the
+    shape of the schedule (human/burst randomness) is kept.  Pauses and
+    waits between repeats are left out via gap().
+    """
+
+    WINDOW = 64
+    STEP = 8
+    KP = 0.3          # weight of the rolling-window rate error
+    KI = 0.15         # weight of the whole-run rate error
+    MIN_SCALE = 0.02
+    MAX_SCALE = 50.0
+
+    def __init__(self, target_cps, scale=1.0):
+        self.target = target_cps
+        self.scale = scale
+        self.chars = 0
+        self.busy = 0.0       # typing time, gaps excluded
+        self._times = array("d", [0.0]) * self.WINDOW
+        self._chars = array("d", [0.0]) * self.WINDOW
+        self._n = 0           # keystrokes since the last gap
+        self._last = 0.0
+
+    def key(self, t, chars=1):
+        """Record a keystroke sent at perf_counter() t."""
+        w = self.WINDOW
+        if self._n:
+            self.busy += t - self._last
+            self.chars += chars
+        self._last = t
+        self._times[self._n % w] = t
+        self._chars[self._n % w] = chars
+        self._n += 1
+        if self._n % self.STEP or self._n < 2 * self.STEP:
+            return
+        m = min(self._n, w)
+        span = t - self._times[(self._n - m) % w]
+        if span <= 0 or self.busy <= 0:
+            return
+        win = (sum(self._chars) if m == w
+               else sum(self._chars[:m])) - self._chars[(self._n - m) % w]
+        ratio = ((win / span / self.target) ** self.KP
+                 * (self.chars / self.busy / self.target) ** self.KI)
+        self.scale = min(self.MAX_SCALE,
+                         max(self.MIN_SCALE, self.scale * ratio))
+
+    def gap(self):
+        """The next keystroke follows a pause; don't count the gap."""
+        self._n = 0
+
+    def rate(self):
+        """Achieved chars/s so far."""
+        return self.chars / self.busy if self.busy > 0 else 0.0
+
+
+class LatencyStats:
+    """Streaming inter-key latency statistics for one session.
+
+    Intervals go into log-spaced buckets (2% wide, 10 us to a minute),
+    so percentiles cost a fixed 3 KB however long the session runs.
+    Each interval also counts against the delay that was planned for
+    it, giving the largest stall and the achieved vs target rate.
+    """
+
+    MIN = 1e-5
+    GROWTH = 1.02
+    BUCKETS = 800
+
+    def __init__(self):
+        self.counts = array("I", [0]) * self.BUCKETS
+        self._scale = 1.0 / math.log(self.GROWTH)
+        self.n = 0
+        self.chars = 0
+        self.total = 0.0      # sum of intervals
+        self.planned = 0.0    # sum of the delays planned for them
+        self.stall = 0.0      # largest interval - planned
+
+    def add(self, interval, planned, chars=1):
+        if interval > self.MIN:
+            i = int(math.log(interval / self.MIN) * self._scale)
+            if i >= self.BUCKETS:
+                i = self.BUCKETS - 1
+        else:
+            i = 0
+        self.counts[i] += 1
+        self.n += 1
+        self.chars += chars
+        self.total += interval
+        self.planned += planned
+        if interval - planned > self.stall:
+            self.stall = interval - planned
+
+    def percentile(self, q):
+        """Approximate q-quantile (0-1) of the intervals, in seconds."""
+        if not self.n:
+            return 0.0
+        rank = q * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank:
+                return self.MIN * self.GROWTH ** (i + 0.5)
+        return 0.0
+
+    def summary(self):
+        """Percentiles and stall in ms, rates in chars/s; {} if empty."""
+        if not self.n:
+            return {}
+        return {
+            "p50": round(self.percentile(0.50) * 1000.0, 2),
+            "p95": round(self.percentile(0.95) * 1000.0, 2),
+            "p99": round(self.percentile(0.99) * 1000.0, 2),
+            "stall": round(self.stall * 1000.0, 1),
+            "cps": round(self.chars / self.total, 1) if self.total else 0.0,
+            "target_cps": (round(self.chars / self.planned, 1)
+                           if self.planned else 0.0),
+        }
+
+
+# ==================================================================
+# Keystroke Traces
+# ==================================================================
+class KeystrokeTrace:
+    """Per-keystroke timing of one session.
+
+    For every step: when it was due (planned), when the backend call
+    began (sent) and how long the call took (cost), in seconds from the
+    start of typing.  The buffers are allocated up front so recording a
+    step is three stores.  The typed text itself is not kept.
+    """
+
+    MAGIC = b"AWT1"
+    HEADER = "<4sIII"     # magic, steps, dropped, metadata length
+    MAX_STEPS = 2000000
+    STALL = 0.05          # a step this much later than planned is a stall
+
+    def __init__(self, capacity, meta=None):
+        n = max(1, min(capacity, self.MAX_STEPS))
+        self.planned = array("d", [0.0]) * n
+        self.sent = array("d", [0.0]) * n
+        self.cost = array("d", [0.0]) * n
+        self.n = 0
+        self.dropped = 0      # steps past the buffer size
+        self.meta = dict(meta or {})
+
+    def add(self, planned, sent, cost):
+        n = self.n
+        if n == len(self.planned):
+            self.dropped += 1
+            return
+        self.planned[n] = planned
+        self.sent[n] = sent
+        self.cost[n] = cost
+        self.n = n + 1
+
+    def lateness(self):
+        """sent - planned for each step, in seconds."""
+        return array("d", [self.sent[i] - self.planned[i]
+                           for i in range(self.n)])
+
+    def jitter(self):
+        """Actual minus planned interval between consecutive steps."""
+        s, p = self.sent, self.planned
+        return array("d", [(s[i] - s[i - 1]) - (p[i] - p[i - 1])
+                           for i in range(1, self.n)])
+
+    def summary(self):
+        """Lateness/jitter/cost statistics in milliseconds."""
+        late = sorted(self.lateness())
+        jit = self.jitter()
+        n = self.n
+        if not n:
+            return {"steps": 0}
+
+        def pct(q):
+            return late[min(n - 1, int(n * q))] * 1000.0
+        return {
+            "steps": n,
+            "dropped": self.dropped,
+            "late_p50": pct(0.50),
+            "late_p99": pct(0.99),
+            "late_max": late[-1] * 1000.0,
+            "jitter": (math.fsum(abs(j) for j in jit) / len(jit) * 1000.0
+                       if jit else 0.0),
+            "cost_mean": math.fsum(self.cost[:n]) / n * 1000.0,
+            "cost_max": max(self.cost[:n]) * 1000.0,
+            "stalls": sum(1 for x in late if x > self.STALL),
+        }
+
+    def save(self, path):
+        meta = json.dumps(self.meta).encode("utf-8")
+        with open(path + ".tmp", "wb") as fh:
+            fh.write(struct.pack(self.HEADER, self.MAGIC, self.n,
+                                 self.dropped, len(meta)))
+            fh.write(meta)
+            for arr in (self.planned, self.sent, self.cost):
+                fh.write(memoryview(arr)[:self.n])
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as fh:
+            data = fh.read()
+        head = struct.calcsize(cls.HEADER)
+        magic, n, dropped, n_meta = struct.unpack_from(cls.HEADER, data)
+        if magic != cls.MAGIC:
+            raise ValueError("not a keystroke trace")
+        trace = cls(n, json.loads(data[head:head + n_meta].decode("utf-8")))
+        trace.dropped = dropped
+        pos = head + n_meta
+        for name in ("planned", "sent", "cost"):
+            arr = array("d")
+            arr.frombytes(data[pos:pos + n * arr.itemsize])
+            if len(arr) != n:
+                raise ValueError("truncated keystroke trace")
+            arr.extend((0.0,) * (len(trace.planned) - n))
+            setattr(trace, name, arr)
+            pos += n * arr.itemsize
+        trace.n = n
+        return trace
+
+    def replay(self, backend, stop_event=None):
+        """Send one placeholder key per step on the planned timeline;
+        returns the trace of the replay."""
+        out = KeystrokeTrace(self.n, dict(self.meta, replay=True))
+        sched = TypingScheduler(stop_event)
+        planned = self.planned
+        prev = 0.0
+        for i in range(self.n):
+            sched.wait(planned[i] - prev)
+            prev = planned[i]
+            if stop_event is not None and stop_event.is_set():
+                break
+            t = time.perf_counter()
+            backend.type_char(" ")
+            backend.flush()
+            out.add(sched.due, t - sched.t0, time.perf_counter() - t)
+        return out
+
+
 # ==================================================================
 # Typing Backends
 # ==================================================================
 class TypingBackend:
     hotkey_label = "F9"
     hotkey_supported = False
+    unicode_supported = False
     shift_enter = True
+    unicode_only = False    # send every char as a Unicode packet
+    hotkey_at = 0.0      # perf_counter() of the last stop-hotkey press
+    _wake = ()
+    events_sent = 0      # key events actually sent this session
+    events_naive = 0     # ... and without modifier tracking
 
     def type_char(self, ch):
         raise NotImplementedError
 
+    def layout_id(self):
+        """Identify the active keyboard layout (part of plan validity)."""
+        return ""
+
+    def compile(self, text):
+        return KeystrokePlan(text, self.layout_id())
+
+    def play(self, plan, i):
+        """Send character i of a compiled plan."""
+        self.type_char(plan.text[i])
+
+    def paste(self):
+        """Send the platform paste chord (Instant mode)."""
+        raise NotImplementedError
+
+    def flush(self):
+        """Push any buffered events to the OS (once per scheduled tick)."""
+        pass
+
+    def release_modifiers(self):
+        """Let go of modifiers held across characters (pause/stop/end)."""
+        pass
+
+    def arm(self, *events):
+        """Start of a session: reset counters and start the stop-hotkey
+        listener; a press sets every event."""
+        self.hotkey_at = 0.0
+        self.events_sent = self.events_naive = 0
+        self._wake = events
+
+    def disarm(self):
+        self._wake = ()
+
+    def _on_hotkey(self):
+        """Called from the listener thread when the stop key goes down."""
+        if not self._wake:
+            return
+        self.hotkey_at = time.perf_counter()
+        for ev in self._wake:
+            ev.set()
+
+    def _poll_hotkey(self, pressed, done):
+        """Fallback listener: sample the stop key every 5 ms."""
+        while not done.wait(0.005):
+            if pressed():
+                self._on_hotkey()
+                return
+
     def stop_requested(self):
-        return False
+        return self.hotkey_at > 0
 
     def shutdown(self):
-        pass
+        self.disarm()
 
 
 class WindowsBackend(TypingBackend):
     hotkey_supported = True
+    unicode_supported = True
+    # Largest single character: 3 modifier changes each way + a surrogate pair.
+    _BATCH = 16
 
-    def _send(self, vk=0, scan=0, flags=0):
-        i = _INP(type=_IK)
-        i.ki = _KBI(wVk=vk, wScan=scan, dwFlags=flags,
-                     time=0, dwExtraInfo=None)
-        _u32.SendInput(1, ctypes.byref(i), ctypes.sizeof(_INP))
+    def __init__(self):
+        # One reusable INPUT array; a character's events are queued into
+        # it and submitted with a single SendInput call.
+        self._buf = (_INP * self._BATCH)()
+        for inp in self._buf:
+            inp.type = _IK
+        self._n = 0
+        self._layout = None
+        self._keys = {}
+        self._held = 0
+        self._hk_thread = None
 
-    def _tap(self, vk):
-        self._send(vk=vk)
-        self._send(vk=vk, flags=_KU)
+    def _send(self, vk=0, scan=0, flags=0):
+        if self._n == self._BATCH:
+            self._flush()
+        ki = self._buf[self._n].ki
+        ki.wVk = vk
+        ki.wScan = scan
+        ki.dwFlags = flags
+        self._n += 1
+
+    def _flush(self):
+        if self._n:
+            _u32.SendInput(self._n, self._buf, ctypes.sizeof(_INP))
+            self._n = 0
 
     def type_char(self, ch):
-        if ch == "\n":
-            if self.shift_enter:
-                self._send(vk=_VS)
-                self._tap(_VR)
-                self._send(vk=_VS, flags=_KU)
+        self.play(self.compile(ch), 0)
+        self.release_modifiers()
+
+    def layout_id(self):
+        if self.unicode_only:
+            return "unicode"
+        return "%08x" % (_u32.GetKeyboardLayout(0) & 0xFFFFFFFF)
+
+    def compile(self, text):
+        layout = self.layout_id()
+        if layout != self._layout:
+            # VkKeyScanW results are only valid for the layout they came from
+            self._layout = layout
+            self._keys = {}
+        keys = self._keys
+        lookup = self._unicode if self.unicode_only else self._lookup
+        plan = KeystrokePlan(text, layout)
+        vk, scan, flags, offsets = plan.vk, plan.scan, plan.flags, plan.offsets
+        mods = plan.mods
+        enter = ((_VR, _VR), (0, 0), (0, _KU),
+                 MOD_SHIFT if self.shift_enter else 0, False)
+        for ch in text:
+            if ch == "\n":
+                ev = enter
             else:
-                self._tap(_VR)
-            return
+                ev = keys.get(ch)
+                if ev is None:
+                    ev = keys[ch] = lookup(ch)
+            vk.extend(ev[0])
+            scan.extend(ev[1])
+            flags.extend(ev[2])
+            offsets.append(len(vk))
+            mods.append(ev[3])
+            if ev[4]:
+                plan.unmapped += 1
+        return plan
+
+    def _unicode(self, ch, unmapped=False):
+        """KEYEVENTF_UNICODE events for ch; no layout or modifiers."""
         c = ord(ch)
         # Emoji / chars above U+FFFF  ->  UTF-16 surrogate pairs
         if c > 0xFFFF:
             hi = 0xD800 + ((c - 0x10000) >> 10)
             lo = 0xDC00 + ((c - 0x10000) & 0x3FF)
-            for surrogate in (hi, lo):
-                self._send(scan=surrogate, flags=_KUN)
-                self._send(scan=surrogate, flags=_KUN | _KU)
-            return
+            return ((0, 0, 0, 0), (hi, hi, lo, lo),
+                    (_KUN, _KUN | _KU, _KUN, _KUN | _KU), 0, unmapped)
+        return ((0, 0), (c, c), (_KUN, _KUN | _KU), 0, unmapped)
+
+    def _lookup(self, ch):
+        """Decode one character into (vks, scans, flags, mods, unmapped)."""
+        c = ord(ch)
+        if c > 0xFFFF:
+            return self._unicode(ch, True)
         m = _u32.VkKeyScanW(c)
         if m in (-1, 0xFFFF):
-            self._send(scan=c, flags=_KUN)
-            self._send(scan=c, flags=_KUN | _KU)
-            return
+            return self._unicode(ch, True)
         vk, sh = m & 0xFF, (m >> 8) & 0xFF
-        mods = []
-        if sh & 1:
-            mods.append(_VS)
-        if sh & 2:
-            mods.append(_VC)
-        if sh & 4:
-            mods.append(_VM)
-        for mod in mods:
-            self._send(vk=mod)
-        self._tap(vk)
-        for mod in reversed(mods):
-            self._send(vk=mod, flags=_KU)
+        # VkKeyScanW shift state bits: 1 Shift, 2 Ctrl, 4 Alt (= MOD_*)
+        return ((vk, vk), (0, 0), (0, _KU), sh & 7, False)
+
+    def _set_mods(self, need):
+        """Queue the modifier presses/releases to go from held to need."""
+        held = self._held
+        order = ((MOD_SHIFT, _VS), (MOD_CTRL, _VC), (MOD_ALT, _VM))
+        for bit, vk in reversed(order):
+            if held & bit and not need & bit:
+                self._send(vk=vk, flags=_KU)
+        for bit, vk in order:
+            if need & bit and not held & bit:
+                self._send(vk=vk)
+        self._held = need
+
+    def play(self, plan, i):
+        vk, scan, flags = plan.vk, plan.scan, plan.flags
+        start, end = plan.offsets[i], plan.offsets[i + 1]
+        need = plan.mods[i]
+        n = self._n
+        if need != self._held:
+            self._set_mods(need)
+        for e in range(start, end):
+            self._send(vk[e], scan[e], flags[e])
+        self.events_sent += self._n - n
+        self.events_naive += end - start + 2 * bin(need).count("1")
+        self._flush()
+
+    def release_modifiers(self):
+        if self._held:
+            n = self._n
+            self._set_mods(0)
+            self.events_sent += self._n - n
+            self._flush()
+
+    def paste(self):
+        for vk, flags in ((_VC, 0), (_VV, 0), (_VV, _KU), (_VC, _KU)):
+            self._send(vk=vk, flags=flags)
+        self._flush()
+
+    def arm(self, *events):
+        TypingBackend.arm(self, *events)
+        self._hk_done = threading.Event()
+        self._hk_tid = 0
+        ready = threading.Event()
+        self._hk_thread = threading.Thread(
+            target=self._hotkey_loop, args=(ready,), daemon=True)
+        self._hk_thread.start()
+        ready.wait(1.0)
+
+    def _hotkey_loop(self, ready):
+        self._hk_tid = _k32.GetCurrentThreadId()
+        if not _u32.RegisterHotKey(None, 1, _MOD_NOREPEAT, _VF9):
+            # F9 is taken by another app: fall back to polling it
+            ready.set()
+            self._poll_hotkey(
+                lambda: _u32.GetAsyncKeyState(_VF9) & 0x8000,
+                self._hk_done)
+            return
+        # Hotkeys match modifiers exactly, and typing may be holding any
+        # of Shift/Ctrl/Alt: register F9 under every combination.
+        # (MOD_ALT=1, MOD_CONTROL=2, MOD_SHIFT=4 for RegisterHotKey.)
+        for combo in range(1, 8):
+            _u32.RegisterHotKey(None, combo + 1, combo | _MOD_NOREPEAT, _VF9)
+        ready.set()
+        msg = ctypes.wintypes.MSG()
+        try:
+            while _u32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                if msg.message == _WM_HOTKEY:
+                    self._on_hotkey()
+        finally:
+            for hk_id in range(1, 9):
+                _u32.UnregisterHotKey(None, hk_id)
 
-    def stop_requested(self):
-        return bool(_u32.GetAsyncKeyState(_VF9) & 0x8000)
+    def disarm(self):
+        TypingBackend.disarm(self)
+        if self._hk_thread is None:
+            return
+        self._hk_done.set()
+        if self._hk_tid:
+            _u32.PostThreadMessageW(self._hk_tid, _WM_QUIT, 0, 0)
+        self._hk_thread.join(1.0)
+        self._hk_thread = None
 
 
 class PynputBackend(TypingBackend):
@@ -154,13 +1102,12 @@ class PynputBackend(TypingBackend):
         from pynput import keyboard as kb
         self._kb = kb
         self._ctrl = kb.Controller()
-        self._flag = threading.Event()
         self._lis = kb.Listener(on_press=self._on_press)
         self._lis.start()
 
     def _on_press(self, key):
         if key == self._kb.Key.f9:
-            self._flag.set()
+            self._on_hotkey()
 
     def type_char(self, ch):
         if ch == "\n":
@@ -175,19 +1122,380 @@ class PynputBackend(TypingBackend):
         else:
             self._ctrl.type(ch)
 
-    def stop_requested(self):
-        if self._flag.is_set():
-            self._flag.clear()
-            return True
-        return False
+    def paste(self):
+        mod = self._kb.Key.cmd if SYSTEM == "Darwin" else self._kb.Key.ctrl
+        with self._ctrl.pressed(mod):
+            self._ctrl.press("v")
+            self._ctrl.release("v")
 
     def shutdown(self):
+        self.disarm()
         self._lis.stop()
 
 
+class XTestBackend(TypingBackend):
+    """Native X11 backend: XTest fake key events through ctypes.
+
+    Keysym -> keycode lookups come from one cached keyboard mapping.
+    Characters the layout has no key for are bound on demand to spare
+    (unused) keycodes.  Events are buffered by Xlib until flush().
+    """
+
+    hotkey_supported = True
+    _UP = 1          # plan flag: key release
+    _REMAP = 2       # plan flag: keycode resolved at play time
+    _XK_SHIFT = 0xFFE1
+    _XK_RETURN = 0xFF0D
+    _XK_TAB = 0xFF09
+    _XK_CTRL = 0xFFE3
+    _XK_V = 0x76
+    _XK_F9 = 0xFFC6
+
+    def __init__(self):
+        self._x11, xtst = _load_xlib()
+        self._fake = xtst.XTestFakeKeyEvent
+        self._dpy = self._x11.XOpenDisplay(None)
+        if not self._dpy:
+            raise RuntimeError("Cannot open X display")
+        lo, hi = ctypes.c_int(), ctypes.c_int()
+        self._x11.XDisplayKeycodes(self._dpy, ctypes.byref(lo),
+                                   ctypes.byref(hi))
+        self._min_kc, self._max_kc = lo.value, hi.value
+        self._layout = None
+        self._syms = {}       # keysym -> (keycode, needs_shift)
+        self._keys = {}       # char -> compiled events
+        self._spare = []      # keycodes with no keysyms bound
+        self._remapped = {}   # keysym -> spare keycode, oldest first
+        self._held = 0
+        self._hk_thread = None
+        self._refresh_mapping()
+        kc = self._x11.XKeysymToKeycode
+        self._shift = kc(self._dpy, self._XK_SHIFT)
+        self._ctrl_kc = kc(self._dpy, self._XK_CTRL)
+        self._f9 = kc(self._dpy, self._XK_F9)
+
+    @staticmethod
+    def _keysym(ch):
+        c = ord(ch)
+        if ch == "\n":
+            return XTestBackend._XK_RETURN
+        if ch == "\t":
+            return XTestBackend._XK_TAB
+        if 0x20 <= c <= 0x7E or 0xA0 <= c <= 0xFF:
+            return c
+        return 0x01000000 | c
+
+    def _refresh_mapping(self):
+        """Re-read the keyboard mapping; rebuild caches if it changed."""
+        count = self._max_kc - self._min_kc + 1
+        per = ctypes.c_int()
+        ptr = self._x11.XGetKeyboardMapping(self._dpy, self._min_kc, count,
+                                            ctypes.byref(per))
+        per = per.value
+        try:
+            syms = ptr[:count * per]
+        finally:
+            self._x11.XFree(ptr)
+        ours = set(self._remapped.values())
+        rows = []
+        for idx in range(count):
+            kc = self._min_kc + idx
+            row = syms[idx * per:(idx + 1) * per]
+            rows.append([0] * per if kc in ours else row)
+        layout = "%08x" % zlib.crc32(repr(rows).encode("ascii"))
+        if layout == self._layout:
+            return layout
+        self._layout = layout
+        self._keys = {}
+        self._syms = {}
+        spare = []
+        for idx, row in enumerate(rows):
+            kc = self._min_kc + idx
+            if not any(row):
+                spare.append(kc)
+                continue
+            base = row[0]
+            shifted = row[1] if per > 1 else 0
+            if not shifted and 0x61 <= base <= 0x7A:
+                shifted = base - 0x20   # lowercase-only rows imply Shift
+            if base:
+                self._syms.setdefault(base, (kc, False))
+            if shifted:
+                self._syms.setdefault(shifted, (kc, True))
+        self._spare = spare
+        self._remapped = {s: k for s, k in self._remapped.items()
+                          if k in spare}
+        return layout
+
+    def layout_id(self):
+        return self._refresh_mapping()
+
+    def compile(self, text):
+        layout = self._refresh_mapping()
+        keys = self._keys
+        plan = KeystrokePlan(text, layout)
+        vk, scan, flags, offsets = plan.vk, plan.scan, plan.flags, plan.offsets
+        mods = plan.mods
+        ret = self._syms.get(self._XK_RETURN, (0, False))[0]
+        enter = ((ret, ret), (0, self._UP),
+                 MOD_SHIFT if self.shift_enter else 0, False)
+        for ch in text:
+            if ch == "\n":
+                ev = enter
+            else:
+                ev = keys.get(ch)
+                if ev is None:
+                    ev = keys[ch] = self._lookup(ch)
+            vk.extend(ev[0])
+            flags.extend(ev[1])
+            scan.extend((0,) * len(ev[0]))
+            offsets.append(len(vk))
+            mods.append(ev[2])
+            if ev[3]:
+                plan.unmapped += 1
+        return plan
+
+    def _lookup(self, ch):
+        """Decode one character into (keycodes, flags, mods, unmapped)."""
+        sym = self._keysym(ch)
+        hit = self._syms.get(sym)
+        if hit is None:
+            return ((0, 0), (self._REMAP, self._REMAP | self._UP), 0, True)
+        kc, shift = hit
+        return ((kc, kc), (0, self._UP), MOD_SHIFT if shift else 0, False)
+
+    def _remap(self, ch):
+        """Bind ch's keysym to a spare keycode (least recently bound)."""
+        sym = self._keysym(ch)
+        kc = self._remapped.get(sym)
+        if kc is not None:
+            return kc
+        if not self._spare:
+            return 0
+        if len(self._remapped) < len(self._spare):
+            kc = self._spare[len(self._remapped)]
+        else:
+            kc = self._remapped.pop(next(iter(self._remapped)))
+        self._bind(kc, sym)
+        self._remapped[sym] = kc
+        return kc
+
+    def _bind(self, kc, sym):
+        pair = (ctypes.c_ulong * 2)(sym, sym)
+        self._x11.XChangeKeyboardMapping(self._dpy, kc, 2, pair, 1)
+        self._x11.XSync(self._dpy, 0)
+
+    def play(self, plan, i):
+        vk, flags = plan.vk, plan.flags
+        fake, dpy = self._fake, self._dpy
+        start, end = plan.offsets[i], plan.offsets[i + 1]
+        shift = plan.mods[i] & MOD_SHIFT
+        sent = end - start
+        if shift != self._held:
+            fake(dpy, self._shift, bool(shift), 0)
+            self._held = shift
+            sent += 1
+        for e in range(start, end):
+            f = flags[e]
+            kc = self._remap(plan.text[i]) if f & self._REMAP else vk[e]
+            if kc:
+                fake(dpy, kc, not (f & self._UP), 0)
+        self.events_sent += sent
+        self.events_naive += end - start + (2 if shift else 0)
+
+    def release_modifiers(self):
+        if self._held:
+            self._fake(self._dpy, self._shift, False, 0)
+            self._held = 0
+            self.events_sent += 1
+            self.flush()
+
+    def type_char(self, ch):
+        self.play(self.compile(ch), 0)
+        self.release_modifiers()
+        self.flush()
+
+    def paste(self):
+        kc = self._syms.get(self._XK_V, (0, False))[0]
+        if not kc or not self._ctrl_kc:
+            raise RuntimeError("No Ctrl+V keys on this keyboard layout")
+        for code, down in ((self._ctrl_kc, True), (kc, True),
+                           (kc, False), (self._ctrl_kc, False)):
+            self._fake(self._dpy, code, down, 0)
+        self.flush()
+
+    def flush(self):
+        self._x11.XFlush(self._dpy)
+
+    def arm(self, *events):
+        TypingBackend.arm(self, *events)
+        if not self._f9:
+            return
+        # The listener polls on its own connection; Xlib connections
+        # must not be shared between threads.
+        dpy = self._x11.XOpenDisplay(None)
+        if not dpy:
+            return
+        keymap = ctypes.create_string_buffer(32)
+        byte, bit = self._f9 >> 3, 1 << (self._f9 & 7)
+
+        def pressed():
+            self._x11.XQueryKeymap(dpy, keymap)
+            return keymap.raw[byte] & bit
+
+        def run():
+            try:
+                self._poll_hotkey(pressed, self._hk_done)
+            finally:
+                self._x11.XCloseDisplay(dpy)
+        self._hk_done = threading.Event()
+        self._hk_thread = threading.Thread(target=run, daemon=True)
+        self._hk_thread.start()
+
+    def disarm(self):
+        TypingBackend.disarm(self)
+        if self._hk_thread is not None:
+            self._hk_done.set()
+            self._hk_thread.join(1.0)
+            self._hk_thread = None
+
+    def shutdown(self):
+        self.disarm()
+        try:
+            for kc in self._remapped.values():
+                self._bind(kc, 0)
+            self._x11.XCloseDisplay(self._dpy)
+        except Exception:
+            pass
+
+
+class RecordingBackend(TypingBackend):
+    """Records keystrokes instead of sending them.
+
+    Each character (and each paste, as None) is kept with its
+    perf_counter() time, so a run measures the typing loop alone.
+    """
+
+    unicode_supported = True
+
+    def __init__(self):
+        self.times = array("d")
+        self.chars = []
+
+    def type_char(self, ch):
+        self.times.append(time.perf_counter())
+        self.chars.append(ch)
+        self.events_sent += 2
+        self.events_naive += 2
+
+    def paste(self):
+        self.times.append(time.perf_counter())
+        self.chars.append(None)
+
+    def layout_id(self):
+        return "recording"
+
+    def text(self):
+        """Everything typed so far (pastes are left out)."""
+        return "".join(ch for ch in self.chars if ch is not None)
+
+    def clear(self):
+        self.times = array("d")
+        self.chars = []
+
+
+class KeyCosts:
+    """Measured per-keystroke backend cost, by character class.
+
+    measure() times play() + flush() on the live backend (typing into a
+    scratch window); estimate() turns the costs into the extra time a
+    text needs when a key costs more than the delay planned after it.
+    Costs are in seconds and saved per backend in the settings.
+    """
+
+    CLASSES = ("ascii", "shifted", "unicode", "surrogate", "newline")
+    LABELS = ("ASCII", "Shifted", "Unicode", "Emoji", "Newline")
+    SAMPLES = {
+        "ascii": "asdfjkl; qwertyuiop",
+        "shifted": "ASDFJKL:QWERTY!@#$%",
+        "unicode": "\u0100\u0102\u0104\u0106\u0108\u010a\u010c\u010e",
+        "surrogate": "\U0001f600\U0001f680\U0001f44d\U0001f389",
+        "newline": "\n",
+    }
+    _SHIFTED = b"ABCDEFGHIJKLMNOPQRSTUVWXYZ~!@#$%^&*()_+{}|:\"<>?"
+
+    def __init__(self, costs=None):
+        self.cost = dict.fromkeys(self.CLASSES, 0.0)
+        self.cost.update(costs or {})
+
+    def __bool__(self):
+        return any(self.cost.values())
+
+    @classmethod
+    def counts(cls, text):
+        """Characters of text in each class, in CLASSES order."""
+        n = len(text)
+        astral = len(text.encode("utf-16-le", "surrogatepass")) // 2 - n
+        plain = text.encode("ascii", "ignore")
+        other = n - len(plain) - astral
+        newline = text.count("\n")
+        # One C-level pass over the ASCII bytes
+        shifted = len(plain) - len(plain.translate(None, cls._SHIFTED))
+        return (n - astral - other - newline - shifted, shifted, other,
+                astral, newline)
+
+    def estimate(self, text, planned):
+        """Time to type text whose delays sum to planned, allowing for
+        keys that cost more than the mean delay."""
+        if not text:
+            return planned
+        mean = planned / len(text)
+        return planned + math.fsum(
+            n * max(0.0, self.cost[c] - mean)
+            for c, n in zip(self.CLASSES, self.counts(text)))
+
+    def measure(self, backend, reps=30, gap=0.01, stop_event=None):
+        """Time reps keystrokes of each class; keeps the mean cost."""
+        shift_enter = backend.shift_enter
+        backend.shift_enter = True
+        try:
+            for name in self.CLASSES:
+                sample = self.SAMPLES[name]
+                text = (sample * reps)[:reps]
+                plan = backend.compile(text)
+                total = 0.0
+                for i in range(len(text)):
+                    if stop_event is not None and stop_event.is_set():
+                        return False
+                    t = time.perf_counter()
+                    backend.play(plan, i)
+                    backend.flush()
+                    total += time.perf_counter() - t
+                    time.sleep(gap)
+                backend.release_modifiers()
+                self.cost[name] = total / len(text)
+        finally:
+            backend.shift_enter = shift_enter
+        return True
+
+    def describe(self):
+        return "  ".join(label + " " + "%.3f" % (self.cost[c] * 1000)
+                         for c, label in zip(self.CLASSES, self.LABELS)
+                         ) + " ms"
+
+
 def _make_backend():
+    forced = os.environ.get("AWA_BACKEND", "").lower()
+    if forced == "record":
+        return RecordingBackend()
     if SYSTEM == "Windows":
         return WindowsBackend()
+    if SYSTEM == "Linux" and os.environ.get("DISPLAY") and forced != "pynput":
+        try:
+            return XTestBackend()
+        except Exception:
+            if forced == "xtest":
+                raise
     if SYSTEM in ("Darwin", "Linux"):
         return PynputBackend()
     raise RuntimeError("Unsupported OS: " + SYSTEM)
@@ -334,6 +1642,113 @@ class DraftManager:
             pass
 
 
+class CheckpointManager:
+    """Progress of an interrupted typing session, for Resume."""
+
+    def __init__(self):
+        self._path = CHECKPOINT_FILE
+
+    def save(self, data):
+        tmp = self._path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh)
+            os.replace(tmp, self._path)
+        except Exception:
+            pass
+
+    def load(self):
+        try:
+            if os.path.exists(self._path):
+                with open(self._path, "r", encoding="utf-8") as fh:
+                    return json.load(fh)
+        except Exception:
+            pass
+        return None
+
+    def clear(self):
+        try:
+            if os.path.exists(self._path):
+                os.remove(self._path)
+        except Exception:
+            pass
+
+
+class QueueManager:
+    """Batch of typing jobs, run back to back, kept between sessions.
+
+    A job is a dict with "kind" ("text", "preset" or "file"), its
+    "text" / "preset" / "path", and "opts", the typing options it was
+    queued with.
+    """
+
+    def __init__(self):
+        self._path = QUEUE_FILE
+        self.jobs = []
+        self.gap = 5
+        self.start_at = ""
+        self._load()
+
+    def _load(self):
+        try:
+            if os.path.exists(self._path):
+                with open(self._path, "r", encoding="utf-8") as fh:
+                    data = json.load(fh)
+                self.jobs = data.get("jobs", [])
+                self.gap = data.get("gap", self.gap)
+                self.start_at = data.get("start_at", "")
+        except Exception:
+            pass
+
+    def save(self):
+        try:
+            with open(self._path, "w", encoding="utf-8") as fh:
+                json.dump({"jobs": self.jobs, "gap": self.gap,
+                           "start_at": self.start_at}, fh,
+                          ensure_ascii=False)
+        except Exception:
+            pass
+
+    def add(self, job):
+        self.jobs.append(job)
+        self.save()
+
+    def remove(self, job):
+        if job in self.jobs:
+            self.jobs.remove(job)
+            self.save()
+
+    def move(self, i, step):
+        """Move job i up (-1) or down (+1); return its new index."""
+        j = i + step
+        if 0 <= i < len(self.jobs) and 0 <= j < len(self.jobs):
+            self.jobs[i], self.jobs[j] = self.jobs[j], self.jobs[i]
+            self.save()
+            return j
+        return i
+
+    def clear(self):
+        self.jobs = []
+        self.save()
+
+    @staticmethod
+    def label(job):
+        o = job["opts"]
+        if job["kind"] == "file":
+            what = "File: " + os.path.basename(job["path"])
+        elif job["kind"] == "preset":
+            what = "Preset: " + job["preset"]
+        else:
+            what = ("Text: " + job["text"][:30].replace("\n", " ")
+                    + ("..." if len(job["text"]) > 30 else ""))
+        if o.get("target_wpm") and o["mode"] != "paste":
+            speed = str(o["target_wpm"]) + " WPM"
+        else:
+            speed = str(o["delay"]) + " ms"
+        return (what + "  |  " + o["mode"] + ", " + speed + ", "
+                + str(o["repeat"]) + "x")
+
+
 class HistoryManager:
     """Track typing session history and lifetime statistics."""
 
@@ -363,7 +1778,8 @@ class HistoryManager:
         except Exception:
             pass
 
-    def record(self, chars, elapsed, mode, repeat):
+    def record(self, chars, elapsed, mode, repeat, latency=None):
+        """latency: LatencyStats.summary() of the session, if any."""
         self.lifetime["sessions"] += 1
         self.lifetime["chars"] += chars
         self.lifetime["time_sec"] += elapsed
@@ -374,10 +1790,94 @@ class HistoryManager:
             "mode": mode,
             "repeat": repeat,
         }
+        entry.update(latency or {})
         self.sessions.append(entry)
         self._save()
 
 
+class PlanCache:
+    """LRU on-disk cache of compiled keystroke plans.
+
+    Only the plan is cached, keyed on the text, layout, backend and the
+    options that change the keys sent.  Delay schedules are not stored:
+    DelayEngine regenerates them from the seed far faster than a plan
+    compiles.  One small binary file per plan; the file mtime doubles
+    as the last-used stamp for eviction.
+    """
+
+    MAGIC = b"AWP2"
+    HEADER = "<4sIIII"
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self):
+        self._dir = PLAN_CACHE_DIR
+
+    def key(self, text, layout, *options):
+        h = hashlib.sha1(text.encode("utf-8", "surrogatepass"))
+        h.update(("\0" + layout + "\0" + repr(options)).encode("utf-8"))
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self._dir, key + ".bin")
+
+    def load(self, key, text):
+        path = self._path(key)
+        try:
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as fh:
+                data = fh.read()
+            head = struct.calcsize(self.HEADER)
+            magic, n_off, n_ev, unmapped, n_lay = struct.unpack_from(
+                self.HEADER, data)
+            if magic != self.MAGIC or n_off != len(text) + 1:
+                return None
+            pos = head + n_lay
+            plan = KeystrokePlan(text, data[head:pos].decode("ascii"))
+            plan.unmapped = unmapped
+            plan.offsets = array("I")
+            for arr, count in ((plan.vk, n_ev), (plan.scan, n_ev),
+                               (plan.flags, n_ev), (plan.offsets, n_off),
+                               (plan.mods, n_off - 1)):
+                end = pos + count * arr.itemsize
+                arr.frombytes(data[pos:end])
+                pos = end
+            os.utime(path)
+            return plan
+        except Exception:
+            return None
+
+    def store(self, key, plan):
+        try:
+            os.makedirs(self._dir, exist_ok=True)
+            path = self._path(key)
+            layout = plan.layout.encode("ascii")
+            with open(path + ".tmp", "wb") as fh:
+                fh.write(struct.pack(self.HEADER, self.MAGIC,
+                                     len(plan.offsets), plan.events,
+                                     plan.unmapped, len(layout)))
+                fh.write(layout)
+                for arr in (plan.vk, plan.scan, plan.flags, plan.offsets,
+                            plan.mods):
+                    arr.tofile(fh)
+            os.replace(path + ".tmp", path)
+            self._evict()
+        except Exception:
+            pass
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self._dir):
+            st = os.stat(os.path.join(self._dir, name))
+            entries.append((st.st_mtime, st.st_size, name))
+        total = sum(e[1] for e in entries)
+        for _mt, size, name in sorted(entries):
+            if total <= self.MAX_BYTES:
+                break
+            os.remove(os.path.join(self._dir, name))
+            total -= size
+
+
 class AppSettings:
     """Persist user preferences between sessions."""
 
@@ -388,17 +1888,28 @@ class AppSettings:
         "randomness": 40,
         "mode": "normal",
         "repeat": 1,
+        "seed": 0,
+        "target_wpm": 0,
+        "paste_chunk": 2000,
+        "paste_delay": 150,
         "minimize": True,
         "notify": True,
         "skip_empty": False,
         "shift_enter": True,
+        "unicode_only": False,
         "trim_trailing": False,
         "restore_window": True,
+        "trace": False,
+        "engine_process": False,
+        "control_server": False,
+        "profile": False,
+        "profile_target": "Typing session",
         "wrap": True,
         "font_size": 12,
         "win_w": 1060,
         "win_h": 800,
         "recent_files": [],
+        "backend_costs": {},     # backend class name -> KeyCosts.cost
     }
 
     def __init__(self):
@@ -431,28 +1942,1017 @@ class AppSettings:
         self.data[key] = val
 
 
+# ==================================================================
+# Profiling
+# ==================================================================
+class SessionProfiler:
+    """cProfile + tracemalloc around one action.
+
+    cProfile only sees the thread that called start(), so start() and
+    stop() must run on the thread doing the work.  stop() writes the
+    sorted stats and the top allocation sites to a timestamped file in
+    PROFILE_DIR and returns (path, summary lines).
+    """
+
+    TOP_FUNCS = 40
+    TOP_ALLOCS = 25
+    FRAMES = 10        # traceback depth kept per allocation
+
+    def __init__(self, label):
+        self.label = label
+        self._prof = None
+        self._own_tm = False
+        self._t0 = 0.0
+
+    def start(self):
+        self._prof = cProfile.Profile()
+        self._prof.enable()
+        self._own_tm = not tracemalloc.is_tracing()
+        if self._own_tm:
+            tracemalloc.start(self.FRAMES)
+        self._t0 = time.perf_counter()
+
+    def stop(self):
+        self._prof.disable()
+        wall = time.perf_counter() - self._t0
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")))
+        peak = tracemalloc.get_traced_memory()[1]
+        if self._own_tm:
+            tracemalloc.stop()
+        allocs = snap.statistics("lineno")[:self.TOP_ALLOCS]
+
+        out = io.StringIO()
+        out.write("Profile: " + self.label + "\n")
+        out.write("Date: " + time.strftime("%Y-%m-%d %H:%M:%S") + "\n")
+        out.write("Wall time: " + "%.3f" % wall + " s\n")
+        out.write("Peak traced memory: " + "%.1f" % (peak / 1048576.0)
+                  + " MB\n\n")
+        st = pstats.Stats(self._prof, stream=out)
+        st.sort_stats("cumulative").print_stats(self.TOP_FUNCS)
+        st.sort_stats("tottime").print_stats(self.TOP_FUNCS)
+        out.write("Top allocation sites (live at the end):\n")
+        for a in allocs:
+            out.write("  " + "%9.1f" % (a.size / 1024.0) + " KB "
+                      + "%7d" % a.count + " blocks  " + str(a.traceback)
+                      + "\n")
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = re.sub(r"\W+", "-", self.label.lower()).strip("-")
+        path = os.path.join(PROFILE_DIR, time.strftime(
+            "profile-%Y%m%d-%H%M%S-") + name + ".txt")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(out.getvalue())
+
+        lines = ["  " + "%.3f" % wall + " s, peak "
+                 + "%.1f" % (peak / 1048576.0) + " MB traced -> "
+                 + os.path.basename(path)]
+        funcs = sorted(st.stats.items(), key=lambda kv: kv[1][2],
+                       reverse=True)
+        for (fname, line, func), (_cc, nc, tt, ct, _cl) in funcs[:5]:
+            lines.append("  " + "%7.3f" % tt + " s self, " + "%7.3f" % ct
+                         + " s total, " + str(nc) + " calls  "
+                         + os.path.basename(fname) + ":" + str(line)
+                         + "(" + func + ")")
+        for a in allocs[:3]:
+            frame = a.traceback[0]
+            lines.append("  " + "%.1f" % (a.size / 1024.0) + " KB in "
+                         + str(a.count) + " blocks at "
+                         + os.path.basename(frame.filename) + ":"
+                         + str(frame.lineno))
+        return path, lines
+
+
+# ==================================================================
+# Typing Runner
+# ==================================================================
+class TypingRunner:
+    """The typing worker, shared by the GUI and headless mode.
+
+    Subclasses call _init_worker(backend) (or, like App, set the same
+    attributes) and provide the progress sink (_status, _log_msg,
+    _set_progress, _set_elapsed, _set_wpm, _finish).  The hooks below
+    default to doing nothing; nothing here touches Tk.
+    """
+
+    CHECKPOINT_EVERY = 2.0   # seconds between progress checkpoints
+    # How the last job ended, set before _finish is called
+    DONE, STOPPED, ERROR, EMPTY = "done", "stopped", "error", "empty"
+    outcome = STOPPED
+    error = None             # exception that ended the last job, if any
+    trace_keys = False       # record a KeystrokeTrace of each job
+    latency = None           # LatencyStats of the last job
+    last_profile = ""        # where the last profile was written
+    key_costs = None         # KeyCosts calibrated for the backend
+    last_trace = ""          # where the last trace was saved
+
+    def _init_worker(self, backend):
+        """The state _type_job needs, for subclasses without Tk."""
+        self.backend = backend
+        self.stop_event = threading.Event()
+        self.pause_event = threading.Event()
+        self._paused = False
+        self._stop_at = 0.0
+        self._start_time = time.time()
+        self.bigrams = BigramTiming()
+        self.plan_cache = PlanCache()
+        self.checkpoints = CheckpointManager()
+
+    def _before_countdown(self):
+        pass
+
+    def _notify_done(self):
+        pass
+
+    def _read_clipboard(self):
+        raise RuntimeError("Instant mode needs the GUI clipboard")
+
+    def _set_eta(self, elapsed, left):
+        self._set_elapsed(self._fmt_time(elapsed) + " / ~"
+                          + self._fmt_time(left) + " left")
+
+    def _write_clipboard(self, text):
+        raise RuntimeError("Instant mode needs the GUI clipboard")
+
+    def _type_job(self, text, countdown, base_delay, mode, randomness, repeat,
+                  cache_opts=(), paste_opts=(2000, 0.15), seed=None, ck=None,
+                  target_wpm=0):
+        clip = False
+        trace = None
+        self.latency = None
+        ck = ck if ck is not None else {"rep": 0, "offset": 0}
+        first_rep, skip = ck["rep"], ck["offset"]
+        typing = False
+        try:
+            paste = mode == "paste"
+            if paste:
+                chunk, paste_delay = paste_opts
+                clip = self._read_clipboard()
+            else:
+                if target_wpm:
+                    base_delay = 12.0 / target_wpm   # 5 chars per word
+                engine = DelayEngine(mode, base_delay, randomness, seed,
+                                     self.bigrams)
+                if engine.mode != mode:
+                    self._log_msg("  No learned timing recorded; using "
+                                  "Human-like.", "warn")
+
+            def prepare(block, cached=False):
+                if paste:
+                    return (KeystrokePlan(block), array("d", [paste_delay])
+                            * math.ceil(len(block) / chunk))
+                if cached:
+                    return (self._compile_plan(block, cache_opts),
+                            engine.schedule(block))
+                return self.backend.compile(block), engine.schedule(block)
+
+            # Only the first block is read before the countdown, so typing
+            # starts at once however large the source is.  A source that
+            # fits in one block is prepared here and reused for repeats;
+            # longer ones are prepared block by block as they stream.
+            blocks = ((b, text.pos) for b in text.blocks())
+            head = list(itertools.islice(blocks, 2))
+            if not head:
+                self.outcome = self.EMPTY
+                self._finish("Nothing to type after filtering.",
+                             _t("YELLOW"), 0, mode, repeat)
+                return
+            single = len(head) == 1
+            per_pass = None
+            ctl = None
+            if target_wpm and not paste:
+                # Start from the scale that makes the mode's mean delay
+                # hit the target; the controller corrects the rest.
+                b0 = head[0][0]
+                ctl = RateController(1.0 / base_delay, len(b0) * base_delay
+                                     / engine.expected_total(b0))
+                self._log_msg("  Target: " + str(target_wpm) + " WPM ("
+                              + "%.1f" % ctl.target + " c/s), closed loop",
+                              "dim")
+            if single:
+                plan, delays = prepare(head[0][0], True)
+                if ctl is None:
+                    per_pass = math.fsum(delays)
+                    if self.key_costs and not paste:
+                        per_pass = self.key_costs.estimate(head[0][0],
+                                                           per_pass)
+                    self._log_msg("  Schedule: " + self._fmt_time(
+                        per_pass * repeat + repeat - 1) + " of typing", "dim")
+                if plan.events:
+                    self._log_msg("  Plan: " + str(plan.events)
+                                  + " key events", "dim")
+                if plan.unmapped:
+                    self._log_msg("  " + str(plan.unmapped) + " chars have no"
+                                  " key on this layout; sent as Unicode",
+                                  "warn")
+            else:
+                self._log_msg("  Streaming in blocks of "
+                              + self._fmt_number(text.BLOCK) + " chars", "dim")
+
+            self._before_countdown()
+
+            self.backend.arm(self.stop_event, self.pause_event)
+            self._log_msg("Countdown: " + str(countdown) + "s", "warn")
+            for sec in range(countdown, 0, -1):
+                self._status("Starting in " + str(sec)
+                             + "s -- focus the target!", _t("YELLOW"))
+                self._set_progress(int((countdown - sec) / countdown * 5))
+                if self.stop_event.wait(1):
+                    self._log_stop_latency()
+                    self.outcome = self.STOPPED
+                    self._finish("Cancelled.", _t("RED"), 0, mode, repeat)
+                    return
+
+            if (single and not paste
+                    and self.backend.layout_id() != plan.layout):
+                self._log_msg("Keyboard layout changed; recompiling.", "warn")
+                plan = self._compile_plan(head[0][0], cache_opts)
+
+            # Progress is measured in source units (see TextSource).
+            size = text.size
+            total = size * repeat
+            if per_pass is not None:
+                left = per_pass * repeat + repeat - 1
+            typed = 0
+            if self.trace_keys:
+                trace = KeystrokeTrace(
+                    total + repeat,
+                    {"mode": mode, "delay": base_delay,
+                     "backend": type(self.backend).__name__,
+                     "started": time.strftime("%Y-%m-%d %H:%M:%S")})
+            self._start_time = time.time()
+            sched = TypingScheduler(self.stop_event)
+            lat = self.latency = LatencyStats()
+            sent = 0
+            call_time = 0.0      # spent inside the backend
+            expect_cost = 0.0    # ... and what the calibration predicts
+            costs = self.key_costs if not paste else None
+            last_key = 0.0
+            delay = 0.0
+            ck_next = 0.0
+            typing = True
+
+            for rep in range(first_rep, repeat):
+                rep_lbl = ""
+                if repeat > 1:
+                    rep_lbl = " [" + str(rep + 1) + "/" + str(repeat) + "]"
+                    self._log_msg("Repeat " + str(rep + 1) + "/"
+                                  + str(repeat), "cyan")
+
+                hk = ""
+                if self.backend.hotkey_supported:
+                    hk = "  " + self.backend.hotkey_label + " to stop."
+                self._status("Typing..." + rep_lbl + hk, _t("GREEN"))
+
+                if single:
+                    blocks = head
+                elif rep == first_rep:
+                    blocks = itertools.chain(head, blocks)
+                else:
+                    # Same seed each pass, so every pass has the same timing
+                    blocks = ((b, text.pos) for b in text.blocks())
+                    if not paste:
+                        engine = DelayEngine(mode, base_delay, randomness,
+                                             seed, self.bigrams)
+                end = 0
+                offset = 0
+                for block, end_pos in blocks:
+                    start, end = end, end_pos
+                    if skip >= len(block):
+                        # Resuming: this block was typed before
+                        skip -= len(block)
+                        offset += len(block)
+                        continue
+                    if not single:
+                        plan, delays = prepare(block)
+                    n_steps = len(delays)
+                    steps = block[skip:] if skip else block
+                    if paste:
+                        steps = (block[j:j + chunk]
+                                 for j in range(skip, len(block), chunk))
+                    offset += skip
+                    first, skip = (0 if paste else skip), 0
+                    if costs:
+                        expect_cost += math.fsum(
+                            n * costs.cost[c] for c, n in
+                            zip(costs.CLASSES, costs.counts(steps)))
+                    for i, ch in enumerate(steps, first):
+                        if self.stop_event.is_set():
+                            self.checkpoints.save(ck)
+                            self._log_stop_latency()
+                            if self.backend.stop_requested():
+                                msg = ("Stopped by "
+                                       + self.backend.hotkey_label + " after "
+                                       + str(typed) + " chars.")
+                            else:
+                                msg = ("Stopped after " + str(typed)
+                                       + " chars.")
+                            self.outcome = self.STOPPED
+                            self._finish(msg, _t("RED"), typed, mode, repeat)
+                            return
+
+                        if self._paused:
+                            self.backend.release_modifiers()
+                            since = time.perf_counter()
+                            self.pause_event.wait()
+                            sched.resync(since)
+                            last_key = 0.0
+                            if ctl is not None:
+                                ctl.gap()
+                            if self.stop_event.is_set():
+                                self.checkpoints.save(ck)
+                                self._log_stop_latency()
+                                self.outcome = self.STOPPED
+                                self._finish("Stopped while paused.",
+                                             _t("RED"), typed, mode, repeat)
+                                return
+
+                        t_sent = time.perf_counter()
+                        if paste:
+                            self._write_clipboard(ch)
+                            self.backend.paste()
+                        else:
+                            self.backend.play(plan, i)
+                        self.backend.flush()
+                        t_key = time.perf_counter()
+                        call_time += t_key - t_sent
+                        sent += 1
+                        if trace is not None:
+                            trace.add(sched.due, t_sent - sched.t0,
+                                      t_key - t_sent)
+                        if last_key:
+                            # delay is still the one planned before this key
+                            lat.add(t_key - last_key, delay, len(ch))
+                        last_key = t_key
+                        if ctl is not None:
+                            ctl.key(t_key, len(ch))
+                        typed += len(ch)
+                        offset += len(ch)
+                        ck["rep"], ck["offset"] = rep, offset
+                        now = time.time()
+                        if now >= ck_next:
+                            self.checkpoints.save(ck)
+                            ck_next = now + self.CHECKPOINT_EVERY
+
+                        done = (rep * size + start
+                                + (end - start) * (i + 1) / n_steps)
+                        pct = 5 + int(done / total * 95)
+                        self._set_progress(pct)
+
+                        delay = delays[i]
+                        if ctl is not None:
+                            delay *= ctl.scale
+                        elapsed = time.time() - self._start_time
+                        if per_pass is None:
+                            left = elapsed * (total - done) / done
+                        else:
+                            left -= delay
+                        self._set_eta(elapsed, left)
+                        self._set_wpm(typed, elapsed)
+
+                        sched.wait(delay)
+
+                if rep < repeat - 1:
+                    self.backend.release_modifiers()
+                    self._log_msg("Waiting 1s before next repeat...", "dim")
+                    if per_pass is not None:
+                        left -= 1.0
+                    sched.wait(1.0)
+                    last_key = 0.0
+                    if ctl is not None:
+                        ctl.gap()
+
+            typing = False
+            self.checkpoints.clear()
+            elapsed = time.time() - self._start_time
+            self._log_rate(typed, sched)
+            self._log_cost(call_time, sent, expect_cost, paste)
+            if ctl is not None:
+                self._log_target(target_wpm, ctl)
+            self._log_latency()
+            self._set_progress(100)
+            msg = ("Done! " + str(typed) + " characters typed in "
+                   + self._fmt_time(elapsed) + ".")
+            self.outcome = self.DONE
+            self._finish(msg, _t("ACCENT2"), typed, mode, repeat)
+            self._notify_done()
+
+        except Exception as exc:
+            self.error = exc
+            if typing:
+                self.checkpoints.save(ck)
+            self.outcome = self.ERROR
+            self._finish("Error: " + str(exc), _t("RED"), 0, mode, repeat)
+        finally:
+            try:
+                self.backend.release_modifiers()
+            except Exception:
+                pass
+            self.backend.disarm()
+            self._log_events()
+            if trace is not None and trace.n:
+                self._save_trace(trace)
+            if clip is not False:
+                try:
+                    self._write_clipboard(clip)
+                    self._log_msg("Clipboard restored.", "dim")
+                except Exception:
+                    pass
+
+    def _save_trace(self, trace):
+        """Write a session's keystroke trace to TRACE_DIR and log it."""
+        try:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            ms = str(int(time.time() * 1000) % 1000).zfill(3)
+            path = os.path.join(TRACE_DIR, time.strftime(
+                "trace-%Y%m%d-%H%M%S-") + ms + ".bin")
+            trace.save(path)
+        except OSError as exc:
+            self._log_msg("  Could not save trace: " + str(exc), "warn")
+            return
+        self.last_trace = path
+        st = trace.summary()
+        self._log_msg("  Trace: " + str(st["steps"]) + " keystrokes -> "
+                      + os.path.basename(path), "dim")
+        self._log_msg("  Lateness p50 " + "%.2f" % st["late_p50"]
+                      + " / p99 " + "%.2f" % st["late_p99"] + " ms, jitter "
+                      + "%.2f" % st["jitter"] + " ms, "
+                      + str(st["stalls"]) + " stalls", "dim")
+
+    def _profiled(self, label, fn, *args):
+        """Run fn(*args) under a SessionProfiler and log the summary."""
+        prof = SessionProfiler(label)
+        try:
+            prof.start()
+        except ValueError as exc:   # another profiler is active
+            self._log_msg("Profiling unavailable: " + str(exc), "warn")
+            return fn(*args)
+        try:
+            return fn(*args)
+        finally:
+            self._profile_done(prof)
+
+    def _profile_done(self, prof):
+        """Stop a SessionProfiler and log where its report went."""
+        try:
+            path, lines = prof.stop()
+        except Exception as exc:
+            self._log_msg("Profile of " + prof.label + " failed: "
+                          + str(exc), "warn")
+            return
+        self.last_profile = path
+        self._log_msg("Profile of " + prof.label + ":", "accent")
+        for line in lines:
+            self._log_msg(line, "dim")
+
+    def _log_stop_latency(self):
+        """Log the time from the Stop click / hotkey press to the worker."""
+        t0 = self.backend.hotkey_at or self._stop_at
+        if t0:
+            ms = (time.perf_counter() - t0) * 1000.0
+            self._log_msg("  Stop latency: " + "%.1f" % ms + " ms", "dim")
+
+    def _log_events(self):
+        """Log key events sent and how many holding modifiers saved."""
+        sent, naive = self.backend.events_sent, self.backend.events_naive
+        if naive > sent:
+            self._log_msg("  Key events: " + str(sent) + " sent, "
+                          + str(naive - sent) + " saved by held modifiers ("
+                          + "%.0f" % ((naive - sent) * 100.0 / naive) + "%)",
+                          "dim")
+        elif sent:
+            self._log_msg("  Key events: " + str(sent) + " sent", "dim")
+
+    def _log_rate(self, typed, sched):
+        """Log achieved vs target characters per second for the run."""
+        if typed == 0 or sched.planned <= 0:
+            return
+        err = sched.rate_error()
+        self._log_msg("  Rate: " + "%.1f" % (typed / sched.elapsed)
+                      + " c/s achieved vs " + "%.1f" % (typed / sched.planned)
+                      + " c/s target (" + "%+.1f" % (err * 100) + "%)",
+                      "dim" if abs(err) < 0.05 else "warn")
+
+    def _log_cost(self, call_time, keys, expected, paste=False):
+        """Log the time spent in the backend per keystroke, against the
+        calibrated estimate."""
+        if not keys:
+            return
+        per = call_time / keys * 1000.0
+        unit = " ms per paste" if paste else " ms per key"
+        if expected:
+            self._log_msg("  Backend: " + "%.3f" % per + unit + ", "
+                          + "%.3f" % (expected / keys * 1000.0)
+                          + " calibrated", "dim")
+        else:
+            self._log_msg("  Backend: " + "%.3f" % per + unit
+                          + (" (not calibrated)" if not paste else ""), "dim")
+
+    def _log_target(self, target_wpm, ctl):
+        """Log achieved vs target WPM for a closed-loop run."""
+        wpm = ctl.rate() * 12.0
+        if not wpm:
+            return
+        err = wpm / target_wpm - 1.0
+        self._log_msg("  Target WPM: " + "%.0f" % wpm + " achieved vs "
+                      + str(target_wpm) + " target (" + "%+.1f" % (err * 100)
+                      + "%), final delay scale " + "%.2f" % ctl.scale,
+                      "dim" if abs(err) < 0.05 else "warn")
+
+    def _log_latency(self):
+        """Log the inter-key latency percentiles of the run."""
+        st = self.latency.summary() if self.latency else {}
+        if st:
+            self._log_msg("  Latency: p50 " + "%.2f" % st["p50"] + " / p95 "
+                          + "%.2f" % st["p95"] + " / p99 " + "%.2f" % st["p99"]
+                          + " ms, largest stall " + "%.1f" % st["stall"]
+                          + " ms", "dim")
+
+    def _compile_plan(self, text, cache_opts):
+        """Compile text for the backend, reusing a cached plan if possible."""
+        key = self.plan_cache.key(text, self.backend.layout_id(),
+                                  type(self.backend).__name__, *cache_opts)
+        plan = self.plan_cache.load(key, text)
+        if plan is not None:
+            self._log_msg("  Plan: loaded from cache", "dim")
+            return plan
+        plan = self.backend.compile(text)
+        if plan.events:
+            self.plan_cache.store(key, plan)
+        return plan
+
+    def _fmt_time(self, seconds):
+        seconds = float(seconds)
+        if seconds < 60:
+            return str(int(seconds)) + "s"
+        m = int(seconds) // 60
+        sc = int(seconds) % 60
+        if m < 60:
+            return str(m) + "m " + str(sc) + "s"
+        h = m // 60
+        m = m % 60
+        return str(h) + "h " + str(m) + "m"
+
+    def _fmt_number(self, n):
+        """Format a number with thousand separators."""
+        if n < 1000:
+            return str(n)
+        if n < 1000000:
+            return str(n // 1000) + "," + str(n % 1000).zfill(3)
+        return str(n // 1000000) + "," + str((n // 1000) % 1000).zfill(3) + "," + str(n % 1000).zfill(3)
+
+
+# ==================================================================
+# Engine Process
+# ==================================================================
+class EngineProcess:
+    """The typing loop and backend in a child process.
+
+    Keeps typing timing off the GUI's GIL: commands (start, pause,
+    resume, stop) go down one pipe; log lines, status and the result
+    come back up another, and progress goes through a shared block of
+    doubles that the UI polls, so nothing per keystroke crosses the
+    pipe.  The process is started once and reused between sessions.
+    """
+
+    PCT, CHARS, ELAPSED, LEFT = range(4)
+    RELAY = ("_status", "_log_msg", "_before_countdown", "_notify_done")
+    START_TIMEOUT = 15.0
+
+    def __init__(self):
+        ctx = multiprocessing.get_context("spawn")
+        self.block = ctx.RawArray("d", 4)
+        cmd_in, self._cmd = ctx.Pipe(duplex=False)
+        self._events, ev_out = ctx.Pipe(duplex=False)
+        self._lock = threading.Lock()
+        self.proc = ctx.Process(target=_engine_main,
+                                args=(cmd_in, ev_out, self.block),
+                                name="typing-engine", daemon=True)
+        self.proc.start()
+        # Only the child holds these now, so recv() sees EOF if it dies
+        cmd_in.close()
+        ev_out.close()
+        if not self._events.poll(self.START_TIMEOUT):
+            self.close()
+            raise RuntimeError("typing engine did not start")
+        msg = self.recv()
+        if msg[0] != "ready":
+            self.close()
+            raise RuntimeError(msg[1])
+        self.backend_name = msg[1]
+
+    def alive(self):
+        return self.proc.is_alive()
+
+    def _send(self, *msg):
+        with self._lock:
+            self._cmd.send(msg)
+
+    def start(self, args, state, profile=False):
+        """Run _type_job(*args) with the app state the child needs."""
+        for i in range(len(self.block)):
+            self.block[i] = 0.0
+        self._send("start", args, state, profile)
+
+    def pause(self):
+        self._send("pause")
+
+    def resume(self):
+        self._send("resume")
+
+    def stop(self, at=0.0):
+        try:
+            self._send("stop", at)
+        except OSError:
+            pass
+
+    def recv(self):
+        try:
+            return self._events.recv()
+        except EOFError:
+            raise RuntimeError("the engine process exited")
+
+    def close(self):
+        """Stop any session and end the process."""
+        try:
+            self._send("quit")
+        except OSError:
+            pass
+        self.proc.join(3.0)
+        if self.proc.is_alive():
+            self.proc.terminate()
+            self.proc.join(1.0)
+
+
+class EngineRunner(TypingRunner):
+    """The TypingRunner inside the engine process.
+
+    Progress goes into the shared block; everything else is relayed up
+    the event pipe to the app.
+    """
+
+    def __init__(self, backend, events, block):
+        self._init_worker(backend)
+        self._events = events
+        self._block = block
+        self._lock = threading.Lock()
+
+    def _send(self, *msg):
+        try:
+            with self._lock:
+                self._events.send(msg)
+        except OSError:
+            pass    # the app has gone; the checkpoint is already saved
+
+    def configure(self, state):
+        global _current_theme
+        if state["theme"] != _current_theme:
+            _current_theme = state["theme"]
+            _refresh_globals()
+        self.backend.shift_enter = state["shift_enter"]
+        self.backend.unicode_only = (self.backend.unicode_supported
+                                     and state["unicode_only"])
+        self.trace_keys = state["trace"]
+        self.key_costs = KeyCosts(state["key_costs"])
+        self.bigrams = state["bigrams"]
+
+    def run(self, args, profile=False):
+        try:
+            if profile:
+                self._profiled("typing session", self._type_job, *args)
+            else:
+                self._type_job(*args)
+        finally:
+            self._send("done", self.last_trace)
+
+    def _status(self, msg, color=None):
+        self._send("call", "_status", (msg, color))
+
+    def _log_msg(self, msg, tag="info"):
+        self._send("call", "_log_msg", (msg, tag))
+
+    def _before_countdown(self):
+        self._send("call", "_before_countdown", ())
+
+    def _notify_done(self):
+        self._send("call", "_notify_done", ())
+
+    def _set_progress(self, pct):
+        self._block[EngineProcess.PCT] = pct
+
+    def _set_eta(self, elapsed, left):
+        self._block[EngineProcess.ELAPSED] = elapsed
+        self._block[EngineProcess.LEFT] = left
+
+    def _set_wpm(self, chars, elapsed):
+        self._block[EngineProcess.CHARS] = chars
+
+    def _finish(self, msg, color, chars_typed=0, mode="", repeat=1):
+        self._send("finish", (msg, color, chars_typed, mode, repeat),
+                   self.latency,
+                   str(self.error) if self.error is not None else None,
+                   self.outcome)
+
+
+def _engine_main(commands, events, block):
+    """Entry point of the engine process (see EngineProcess)."""
+    try:
+        backend = _make_backend()
+    except Exception as exc:
+        events.send(("error", "no typing backend: " + str(exc)))
+        return
+    runner = EngineRunner(backend, events, block)
+    runner._send("ready", type(backend).__name__)
+    worker = None
+    try:
+        while True:
+            try:
+                msg = commands.recv()
+            except EOFError:
+                break    # the app is gone
+            cmd = msg[0]
+            if cmd == "start":
+                # Reset here, not in the worker, so a stop sent right
+                # after start is never lost
+                runner.stop_event.clear()
+                runner.pause_event.clear()
+                runner._paused = False
+                runner._stop_at = 0.0
+                runner.error = None
+                runner.configure(msg[2])
+                worker = threading.Thread(target=runner.run,
+                                          args=(msg[1], msg[3]), daemon=True)
+                worker.start()
+            elif cmd == "pause":
+                runner._paused = True
+                runner.pause_event.clear()
+            elif cmd == "resume":
+                runner._paused = False
+                runner.pause_event.set()
+            elif cmd == "stop":
+                if not runner.stop_event.is_set():
+                    runner._stop_at = msg[1] or time.perf_counter()
+                runner.stop_event.set()
+                if runner._paused:
+                    runner.pause_event.set()
+            elif cmd == "quit":
+                break
+    finally:
+        runner.stop_event.set()
+        runner.pause_event.set()
+        if worker is not None:
+            worker.join(2.0)
+        backend.shutdown()
+
+
+# ==================================================================
+# Control Server
+# ==================================================================
+class ControlServer:
+    """Local control API: JSON lines over a Unix socket (loopback TCP on
+    Windows), served by asyncio on its own thread.
+
+    Each request is one JSON object with a "cmd" and gets one reply,
+    {"ok": true, ...} or {"ok": false, "error": ...}; an "id" in the
+    request is echoed.  {"cmd": "events"} subscribes the connection to
+    the app's status, log, progress and finished events.  Requests are
+    carried out on the Tk thread by app._api_call, so they act exactly
+    like the buttons (Stop sets stop_event, Pause clears pause_event).
+
+    The address -- and on TCP a token every request must carry -- is
+    written to INFO_FILE while the server runs; the socket is private
+    to the user (mode 0600).
+    """
+
+    SOCKET = os.path.join(APP_DIR, ".control.sock")
+    INFO_FILE = os.path.join(APP_DIR, ".control.json")
+    TICK = 0.25            # seconds between progress events
+    MAX_LINE = 64 << 20    # submitted texts arrive as one line
+    MAX_BACKLOG = 1000     # events held for a slow subscriber
+
+    def __init__(self, app):
+        self.app = app
+        # Unix socket paths are limited to about 100 bytes
+        self.tcp = SYSTEM == "Windows" or len(self.SOCKET.encode()) > 100
+        self.address = ""
+        self.token = None
+        self.loop = None
+        self._subs = set()
+        self._clients = {}      # client task -> its writer
+        self._closing = None
+        self._thread = None
+
+    def start(self):
+        """Start serving; raises if the server cannot listen."""
+        ready = threading.Event()
+        failed = []
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self._serve(ready, failed)),
+            name="control-server", daemon=True)
+        self._thread.start()
+        if not ready.wait(5.0):
+            raise RuntimeError("control server did not start")
+        if failed:
+            raise failed[0]
+
+    def stop(self):
+        if self.loop is not None and self._closing is not None:
+            self.loop.call_soon_threadsafe(self._closing.set)
+            self._thread.join(2.0)
+
+    def publish(self, event):
+        """Queue event for every subscriber; safe from any thread."""
+        if self._subs and self.loop is not None:
+            try:
+                self.loop.call_soon_threadsafe(self._fanout, event)
+            except RuntimeError:
+                pass    # loop closed
+
+    def _fanout(self, event):
+        for q in self._subs:
+            if q.qsize() < self.MAX_BACKLOG:
+                q.put_nowait(event)
+
+    async def _serve(self, ready, failed):
+        self.loop = asyncio.get_running_loop()
+        self._closing = asyncio.Event()
+        try:
+            if self.tcp:
+                server = await asyncio.start_server(
+                    self._client, "127.0.0.1", 0, limit=self.MAX_LINE)
+                port = server.sockets[0].getsockname()[1]
+                self.address = "127.0.0.1:" + str(port)
+                self.token = secrets.token_hex(16)
+            else:
+                if os.path.exists(self.SOCKET):
+                    os.remove(self.SOCKET)
+                # Private from the moment it is bound, not after a chmod
+                umask = os.umask(0o177)
+                try:
+                    server = await asyncio.start_unix_server(
+                        self._client, self.SOCKET, limit=self.MAX_LINE)
+                finally:
+                    os.umask(umask)
+                self.address = self.SOCKET
+            # Holds the TCP token: create it private (a leftover file
+            # would keep its old mode, so replace it)
+            if os.path.exists(self.INFO_FILE):
+                os.remove(self.INFO_FILE)
+            fd = os.open(self.INFO_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                         0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump({"address": self.address, "token": self.token,
+                           "pid": os.getpid()}, fh)
+        except Exception as exc:
+            failed.append(exc)
+            ready.set()
+            return
+        ready.set()
+        ticker = asyncio.create_task(self._tick())
+        async with server:
+            await self._closing.wait()
+        # Let clients (including any accepted just now) see EOF and end
+        # on their own rather than be cancelled with the loop
+        await asyncio.sleep(0)
+        for writer in self._clients.values():
+            writer.close()
+        if self._clients:
+            await asyncio.wait(list(self._clients), timeout=1.0)
+        ticker.cancel()
+        for path in (self.INFO_FILE, None if self.tcp else self.SOCKET):
+            try:
+                if path:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    async def _tick(self):
+        """Publish progress while it changes."""
+        last = None
+        while True:
+            await asyncio.sleep(self.TICK)
+            if not self._subs or not self.app._typing:
+                last = None
+                continue
+            pct, chars, elapsed = self.app._live
+            if (pct, chars) != last:
+                last = (pct, chars)
+                self._fanout({"event": "progress", "progress": pct,
+                              "chars": chars, "elapsed": round(elapsed, 3),
+                              "paused": self.app._paused})
+
+    async def _client(self, reader, writer):
+        events = None
+        pump = None
+        task = asyncio.current_task()
+        self._clients[task] = writer
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:    # longer than MAX_LINE
+                    self._reply(writer, None, error="request too long")
+                    break
+                if not line:
+                    break
+                try:
+                    req = json.loads(line)
+                    if not isinstance(req, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as exc:
+                    self._reply(writer, None, error=str(exc))
+                    continue
+                rid = req.get("id")
+                if self.token is not None and req.get("token") != self.token:
+                    self._reply(writer, rid, error="bad token")
+                    continue
+                cmd = req.get("cmd")
+                if cmd == "events":
+                    if events is None:
+                        events = asyncio.Queue()
+                        self._subs.add(events)
+                        pump = asyncio.create_task(self._pump(events, writer))
+                    self._reply(writer, rid, {})
+                    continue
+                try:
+                    result = await self.loop.run_in_executor(
+                        None, self.app._api_call, cmd, req)
+                except Exception as exc:
+                    self._reply(writer, rid, error=str(exc))
+                else:
+                    self._reply(writer, rid, result)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.pop(task, None)
+            if events is not None:
+                self._subs.discard(events)
+                pump.cancel()
+            writer.close()
+
+    async def _pump(self, events, writer):
+        while True:
+            event = await events.get()
+            writer.write(json.dumps(event).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    def _reply(self, writer, rid, result=None, error=None):
+        if error is not None:
+            msg = {"ok": False, "error": error}
+        else:
+            msg = dict(result, ok=True)
+        if rid is not None:
+            msg["id"] = rid
+        writer.write(json.dumps(msg).encode("utf-8") + b"\n")
+
+
 # ==================================================================
 # Main Application
 # ==================================================================
-class App:
+class App(TypingRunner):
     VERSION = "3.0"
+    PROFILE_TARGETS = ("Typing session", "Replace All", "Text transform",
+                       "Startup")
+    ENGINE_POLL_MS = 100     # progress refresh while the engine types
+    ETA_DELAY_MS = 250       # Est. Time waits for edits to pause
 
     def __init__(self, root, backend):
         self.root = root
         self.backend = backend
         self.presets = PresetManager()
         self.drafts = DraftManager()
+        self.checkpoints = CheckpointManager()
+        self._ckpt = None
+        self.queue = QueueManager()
+        self._queue_active = False
+        self._queue_current = None
         self.history = HistoryManager()
         self.settings = AppSettings()
+        self.plan_cache = PlanCache()
+        self.bigrams = BigramTiming()
+        self.key_costs = KeyCosts(
+            self.settings["backend_costs"].get(type(backend).__name__))
+        self._rec_active = False
+        self._rec_prev = None
+        self._rec_last = 0.0
         self.stop_event = threading.Event()
         self.pause_event = threading.Event()
         self.worker = None
+        self.use_engine = False
+        self._engine = None      # EngineProcess, started on first use
+        self._engine_busy = False
+        self.control = None      # ControlServer, when enabled
+        self._live = [0, 0, 0.0]     # progress %, chars, elapsed
         self._typing = False
         self._paused = False
         self._chars_typed = 0
         self._total_chars = 0
         self._start_time = 0
+        self._stop_at = 0.0
         self._find_visible = False
+        self._eta_job = None
 
         # Apply saved theme
         global _current_theme
@@ -494,12 +2994,26 @@ class App:
         self._rand_lbl.configure(text=str(s["randomness"]) + "%")
         self._mode_var.set(s["mode"])
         self._repeat_var.set(s["repeat"])
+        self._seed_var.set(s["seed"])
+        self._wpm_var.set(s["target_wpm"])
+        self._paste_chunk_var.set(s["paste_chunk"])
+        self._paste_delay_var.set(s["paste_delay"])
         self._minimize_var.set(s["minimize"])
         self._notify_var.set(s["notify"])
         self._skip_nl_var.set(s["skip_empty"])
         self._shift_enter_var.set(s["shift_enter"])
+        self._unicode_var.set(s["unicode_only"])
         self._trim_var.set(s["trim_trailing"])
         self._restore_var.set(s["restore_window"])
+        self._trace_var.set(s["trace"])
+        self._engine_var.set(s["engine_process"])
+        self.use_engine = s["engine_process"]
+        self._ctl_var.set(s["control_server"])
+        if s["control_server"]:
+            self._control_toggle()
+        self._prof_var.set(s["profile"])
+        if s["profile_target"] in self.PROFILE_TARGETS:
+            self._prof_target_var.set(s["profile_target"])
         self._wrap_var.set(s["wrap"])
         self._apply_wrap()
         self._refresh_recent_menu()
@@ -685,15 +3199,18 @@ class App:
         self._tab_log      = ttk.Frame(self.nb, style="BG.TFrame")
         self._tab_stats    = ttk.Frame(self.nb, style="BG.TFrame")
         self._tab_help     = ttk.Frame(self.nb, style="BG.TFrame")
+        self._tab_queue    = ttk.Frame(self.nb, style="BG.TFrame")
 
         self.nb.add(self._tab_editor,   text="   Editor   ")
         self.nb.add(self._tab_settings, text="   Settings   ")
+        self.nb.add(self._tab_queue,    text="   Queue   ")
         self.nb.add(self._tab_log,      text="   Live Log   ")
         self.nb.add(self._tab_stats,    text="   Statistics   ")
         self.nb.add(self._tab_help,     text="   How to Use   ")
 
         self._build_editor_tab()
         self._build_settings_tab()
+        self._build_queue_tab()
         self._build_log_tab()
         self._build_stats_tab()
         self._build_help_tab()
@@ -714,6 +3231,8 @@ class App:
                    command=self._open_file).pack(side="left", padx=2)
         ttk.Button(tb, text="Save", style="Card.TButton",
                    command=self._save_file).pack(side="left", padx=2)
+        ttk.Button(tb, text="Type File", style="Card.TButton",
+                   command=self._type_file).pack(side="left", padx=2)
 
         # Recent files menu
         self._recent_mb = ttk.Menubutton(tb, text="Recent",
@@ -906,6 +3425,7 @@ class App:
         self.textbox.pack(side="left", fill="both", expand=True)
 
         self.textbox.bind("<KeyRelease>", self._on_text_key)
+        self.textbox.bind("<KeyPress>", self._rec_key, add="+")
         self.textbox.bind("<<Paste>>",
                           lambda e: self.root.after(50, self._update_stats))
 
@@ -1007,14 +3527,40 @@ class App:
             ("normal", "Constant",   "Fixed delay between each keystroke"),
             ("human",  "Human-like", "Natural variance, pauses at punctuation"),
             ("burst",  "Burst",      "Fast bursts with micro-pauses between"),
+            ("learned", "Learned",   "Your own recorded typing rhythm"),
+            ("paste",  "Instant",    "Paste chunks via the clipboard"),
         ]:
             rf = ttk.Frame(mode_row, style="Card.TFrame")
             rf.pack(side="left", padx=(0, 24))
             ttk.Radiobutton(rf, text=txt, value=val,
                             variable=self._mode_var,
-                            style="Dark.TRadiobutton").pack(anchor="w")
+                            style="Dark.TRadiobutton",
+                            command=self._update_eta).pack(anchor="w")
             ttk.Label(rf, text=desc, style="Cnt.TLabel").pack(anchor="w")
 
+        # Instant mode chunking
+        paste_row = ttk.Frame(mi, style="Card.TFrame")
+        paste_row.pack(anchor="w", pady=(10, 0))
+        ttk.Label(paste_row, text="Instant: paste", style="Body.TLabel"
+                  ).pack(side="left")
+        self._paste_chunk_var = tk.IntVar(value=2000)
+        self._paste_delay_var = tk.IntVar(value=150)
+        for var, lo, hi, step, unit in [
+            (self._paste_chunk_var, 100, 100000, 100, "chars every"),
+            (self._paste_delay_var, 20, 5000, 10, "ms"),
+        ]:
+            tk.Spinbox(paste_row, from_=lo, to=hi, increment=step, width=7,
+                       textvariable=var,
+                       font=(self._bf, 10),
+                       bg=_t("INP_BG"), fg=_t("FG"),
+                       buttonbackground=_t("CARD"),
+                       insertbackground=_t("ACCENT"),
+                       highlightthickness=1,
+                       highlightbackground=_t("BORDER"),
+                       relief="flat").pack(side="left", padx=(8, 4))
+            ttk.Label(paste_row, text=unit, style="Body.TLabel"
+                      ).pack(side="left")
+
         # ---- Speed Presets ----
         self._card_header(wrapper, "Quick Speed Presets")
         sp_card = self._make_card(wrapper)
@@ -1096,6 +3642,91 @@ class App:
                                    style="ValO.TLabel", width=5)
         self._rand_lbl.pack(side="left", padx=(10, 0))
 
+        # Seed
+        seed_row = ttk.Frame(spi, style="Card.TFrame")
+        seed_row.pack(anchor="w", pady=(10, 0))
+        ttk.Label(seed_row, text="Random seed:", style="Body.TLabel"
+                  ).pack(side="left")
+        self._seed_var = tk.IntVar(value=0)
+        tk.Spinbox(seed_row, from_=0, to=999999, width=8,
+                   textvariable=self._seed_var,
+                   command=self._update_eta,
+                   font=(self._bf, 10),
+                   bg=_t("INP_BG"), fg=_t("FG"),
+                   buttonbackground=_t("CARD"),
+                   insertbackground=_t("ACCENT"),
+                   highlightthickness=1,
+                   highlightbackground=_t("BORDER"),
+                   relief="flat").pack(side="left", padx=(8, 4))
+        ttk.Label(seed_row,
+                  text="0 = different every run; any other value "
+                       "replays the same timing",
+                  style="Cnt.TLabel").pack(side="left", padx=(4, 0))
+
+        # Target WPM
+        wpm_row = ttk.Frame(spi, style="Card.TFrame")
+        wpm_row.pack(anchor="w", pady=(10, 0))
+        ttk.Label(wpm_row, text="Target WPM:", style="Body.TLabel"
+                  ).pack(side="left")
+        self._wpm_var = tk.IntVar(value=0)
+        tk.Spinbox(wpm_row, from_=0, to=3000, increment=10, width=8,
+                   textvariable=self._wpm_var,
+                   command=self._update_eta,
+                   font=(self._bf, 10),
+                   bg=_t("INP_BG"), fg=_t("FG"),
+                   buttonbackground=_t("CARD"),
+                   insertbackground=_t("ACCENT"),
+                   highlightthickness=1,
+                   highlightbackground=_t("BORDER"),
+                   relief="flat").pack(side="left", padx=(8, 4))
+        ttk.Label(wpm_row,
+                  text="0 = off; otherwise replaces the delay and keeps "
+                       "the measured rate on target",
+                  style="Cnt.TLabel").pack(side="left", padx=(4, 0))
+
+        # ---- Learned Timing ----
+        self._card_header(wrapper, "Learned Timing")
+        lt_card = self._make_card(wrapper)
+        lti = ttk.Frame(lt_card, style="Card.TFrame")
+        lti.pack(fill="x", padx=20, pady=14)
+
+        lt_row = ttk.Frame(lti, style="Card.TFrame")
+        lt_row.pack(fill="x")
+        self._rec_btn = ttk.Button(lt_row, text="Record", style="Green.TButton",
+                                   command=self._rec_toggle)
+        self._rec_btn.pack(side="left")
+        ttk.Button(lt_row, text="Reset", style="Card.TButton",
+                   command=self._rec_reset).pack(side="left", padx=(8, 0))
+        self._rec_lbl = ttk.Label(lt_row, text="", style="Body.TLabel")
+        self._rec_lbl.pack(side="left", padx=(12, 0))
+        self._rec_update_label()
+
+        ttk.Label(lti,
+                  text="Click Record, then type naturally in the Editor. "
+                       "The Learned mode replays your rhythm, scaled "
+                       "to the typing delay.",
+                  style="Cnt.TLabel").pack(anchor="w", pady=(8, 0))
+
+        # ---- Backend Calibration ----
+        self._card_header(wrapper, "Backend Calibration")
+        cal_card = self._make_card(wrapper)
+        cli = ttk.Frame(cal_card, style="Card.TFrame")
+        cli.pack(fill="x", padx=20, pady=14)
+
+        cal_row = ttk.Frame(cli, style="Card.TFrame")
+        cal_row.pack(fill="x")
+        ttk.Button(cal_row, text="Calibrate", style="Cyan.TButton",
+                   command=self._calibrate).pack(side="left")
+        self._cal_lbl = ttk.Label(cal_row, text="", style="Body.TLabel")
+        self._cal_lbl.pack(side="left", padx=(12, 0))
+        self._cal_update_label()
+
+        ttk.Label(cli,
+                  text="Types a few keys of each kind into a scratch window "
+                       "and times the backend; the ETA and the session "
+                       "summary then allow for it.",
+                  style="Cnt.TLabel").pack(anchor="w", pady=(8, 0))
+
         # ---- Options ----
         self._card_header(wrapper, "Behavior Options")
         opt_card = self._make_card(wrapper)
@@ -1122,6 +3753,7 @@ class App:
         self._skip_nl_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(oc1, text="Skip empty lines",
                         variable=self._skip_nl_var,
+                        command=self._update_eta,
                         style="Dark.TCheckbutton").pack(anchor="w", pady=3)
 
         self._shift_enter_var = tk.BooleanVar(value=True)
@@ -1129,6 +3761,14 @@ class App:
                         variable=self._shift_enter_var,
                         style="Dark.TCheckbutton").pack(anchor="w", pady=3)
 
+        self._unicode_var = tk.BooleanVar(value=False)
+        uni_cb = ttk.Checkbutton(oc1, text="Unicode injection (no layout lookup)",
+                                 variable=self._unicode_var,
+                                 style="Dark.TCheckbutton")
+        uni_cb.pack(anchor="w", pady=3)
+        if not self.backend.unicode_supported:
+            uni_cb.state(["disabled"])
+
         # Col 2
         oc2 = ttk.Frame(orow, style="Card.TFrame")
         oc2.pack(side="left", fill="x", expand=True)
@@ -1136,6 +3776,7 @@ class App:
         self._trim_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(oc2, text="Trim trailing spaces per line",
                         variable=self._trim_var,
+                        command=self._update_eta,
                         style="Dark.TCheckbutton").pack(anchor="w", pady=3)
 
         self._restore_var = tk.BooleanVar(value=True)
@@ -1153,6 +3794,23 @@ class App:
                         variable=self._progress_title_var,
                         style="Dark.TCheckbutton").pack(anchor="w", pady=3)
 
+        self._trace_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(oc2, text="Record keystroke timing trace",
+                        variable=self._trace_var,
+                        style="Dark.TCheckbutton").pack(anchor="w", pady=3)
+
+        self._engine_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(oc2, text="Type in a separate process",
+                        variable=self._engine_var,
+                        command=self._engine_toggle,
+                        style="Dark.TCheckbutton").pack(anchor="w", pady=3)
+
+        self._ctl_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(oc2, text="Local control API (scripts)",
+                        variable=self._ctl_var,
+                        command=self._control_toggle,
+                        style="Dark.TCheckbutton").pack(anchor="w", pady=3)
+
         # Repeat row
         rep_row = ttk.Frame(oi, style="Card.TFrame")
         rep_row.pack(anchor="w", pady=(10, 0))
@@ -1172,6 +3830,29 @@ class App:
         ttk.Label(rep_row, text="time(s)", style="Body.TLabel"
                   ).pack(side="left")
 
+        # ---- Profiling ----
+        self._card_header(wrapper, "Profiling")
+        pr_card = self._make_card(wrapper)
+        pri = ttk.Frame(pr_card, style="Card.TFrame")
+        pri.pack(fill="x", padx=20, pady=14)
+
+        pr_row = ttk.Frame(pri, style="Card.TFrame")
+        pr_row.pack(fill="x")
+        self._prof_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(pr_row, text="Profile the next",
+                        variable=self._prof_var,
+                        style="Dark.TCheckbutton").pack(side="left")
+        self._prof_target_var = tk.StringVar(value=self.PROFILE_TARGETS[0])
+        ttk.Combobox(pr_row, textvariable=self._prof_target_var,
+                     values=self.PROFILE_TARGETS, style="Dark.TCombobox",
+                     width=16, state="readonly").pack(side="left", padx=(8, 0))
+
+        ttk.Label(pri,
+                  text="Runs it under cProfile and tracemalloc; the report "
+                       "goes to profiles/ and a summary to the Live Log. "
+                       "Startup is profiled on the next launch.",
+                  style="Cnt.TLabel").pack(anchor="w", pady=(8, 0))
+
     # ============================================================
     # Live Log Tab
     # ============================================================
@@ -1191,11 +3872,33 @@ class App:
                    command=self._export_log).pack(side="right", padx=(4, 0))
         ttk.Button(lhdr, text="Clear", style="Card.TButton",
                    command=self._clear_log).pack(side="right")
+        ttk.Button(lhdr, text="Open Trace", style="Card.TButton",
+                   command=self._trace_open).pack(side="right", padx=(0, 4))
+
+        # Trace viewer, shown once a trace is opened
+        self._trace = None
+        self._trace_stop = threading.Event()
+        self._trace_thread = None
+        self._trace_frame = ttk.Frame(lcard, style="Card.TFrame")
+        trow = ttk.Frame(self._trace_frame, style="Card.TFrame")
+        trow.pack(fill="x")
+        self._trace_lbl = ttk.Label(trow, text="", style="Cnt.TLabel")
+        self._trace_lbl.pack(side="left")
+        ttk.Button(trow, text="Close", style="Card.TButton",
+                   command=self._trace_close).pack(side="right", padx=(4, 0))
+        ttk.Button(trow, text="Replay", style="Card.TButton",
+                   command=self._trace_replay).pack(side="right")
+        self._trace_cv = tk.Canvas(self._trace_frame, height=110,
+                                   bg=_t("INP_BG"), highlightthickness=1,
+                                   highlightbackground=_t("BORDER"), bd=0)
+        self._trace_cv.pack(fill="x", pady=(6, 0))
+        self._trace_cv.bind("<Configure>", lambda _e: self._trace_draw())
 
         lwrap = tk.Frame(lcard, bg=_t("INP_BG"),
                          highlightbackground=_t("BORDER"),
                          highlightthickness=1)
         lwrap.pack(fill="both", expand=True, padx=14, pady=(2, 14))
+        self._log_wrap = lwrap
 
         self._log = tk.Text(
             lwrap, font=(self._mf, 10), bg=_t("INP_BG"), fg=_t("FG2"),
@@ -1220,6 +3923,94 @@ class App:
         ]:
             self._log.tag_configure(tag, foreground=_t(col_key))
 
+    # ============================================================
+    # Queue Tab
+    # ============================================================
+    def _build_queue_tab(self):
+        tab = self._tab_queue
+
+        qcard = tk.Frame(tab, bg=_t("CARD"),
+                         highlightbackground=_t("BORDER"),
+                         highlightthickness=1)
+        qcard.pack(fill="both", expand=True, padx=8, pady=8)
+
+        qhdr = ttk.Frame(qcard, style="Card.TFrame")
+        qhdr.pack(fill="x", padx=14, pady=(12, 6))
+        ttk.Label(qhdr, text="Typing Queue", style="Head.TLabel"
+                  ).pack(side="left")
+        ttk.Button(qhdr, text="Add File...", style="Card.TButton",
+                   command=self._queue_add_file).pack(side="right",
+                                                      padx=(4, 0))
+        ttk.Button(qhdr, text="Add Preset", style="Card.TButton",
+                   command=self._queue_add_preset).pack(side="right",
+                                                        padx=(4, 0))
+        ttk.Button(qhdr, text="Add Editor Text", style="Card.TButton",
+                   command=self._queue_add_text).pack(side="right")
+
+        ttk.Label(qcard,
+                  text="Each job keeps the Settings (mode, speed, repeat, "
+                       "options) in effect when it was added. Finished "
+                       "jobs leave the queue.",
+                  style="Cnt.TLabel").pack(anchor="w", padx=14)
+
+        qwrap = tk.Frame(qcard, bg=_t("INP_BG"),
+                         highlightbackground=_t("BORDER"),
+                         highlightthickness=1)
+        qwrap.pack(fill="both", expand=True, padx=14, pady=(6, 6))
+        self._queue_list = tk.Listbox(
+            qwrap, font=(self._mf, 10), bg=_t("INP_BG"), fg=_t("FG"),
+            selectbackground=_t("ACCENT"), selectforeground="#fff",
+            relief="flat", highlightthickness=0, activestyle="none")
+        qsb = tk.Scrollbar(qwrap, command=self._queue_list.yview,
+                           bg=_t("CARD"), troughcolor=_t("INP_BG"),
+                           highlightthickness=0, bd=0, width=10)
+        self._queue_list.configure(yscrollcommand=qsb.set)
+        qsb.pack(side="right", fill="y")
+        self._queue_list.pack(side="left", fill="both", expand=True,
+                              padx=8, pady=6)
+
+        qbtn = ttk.Frame(qcard, style="Card.TFrame")
+        qbtn.pack(fill="x", padx=14, pady=(0, 6))
+        ttk.Button(qbtn, text="Up", style="CardSm.TButton",
+                   command=lambda: self._queue_move(-1)).pack(side="left")
+        ttk.Button(qbtn, text="Down", style="CardSm.TButton",
+                   command=lambda: self._queue_move(1)
+                   ).pack(side="left", padx=(4, 0))
+        ttk.Button(qbtn, text="Remove", style="Card.TButton",
+                   command=self._queue_remove).pack(side="left", padx=(12, 0))
+        ttk.Button(qbtn, text="Clear", style="Card.TButton",
+                   command=self._queue_clear).pack(side="left", padx=(4, 0))
+
+        qrun = ttk.Frame(qcard, style="Card.TFrame")
+        qrun.pack(fill="x", padx=14, pady=(4, 14))
+        ttk.Label(qrun, text="Gap between jobs (s):",
+                  style="Body.TLabel").pack(side="left")
+        self._queue_gap_var = tk.IntVar(value=self.queue.gap)
+        tk.Spinbox(qrun, from_=0, to=3600, width=5,
+                   textvariable=self._queue_gap_var,
+                   font=(self._bf, 10),
+                   bg=_t("INP_BG"), fg=_t("FG"),
+                   buttonbackground=_t("CARD"),
+                   insertbackground=_t("ACCENT"),
+                   highlightthickness=1,
+                   highlightbackground=_t("BORDER"),
+                   relief="flat").pack(side="left", padx=(8, 16))
+        ttk.Label(qrun, text="Start at (HH:MM, blank = now):",
+                  style="Body.TLabel").pack(side="left")
+        self._queue_at_var = tk.StringVar(value=self.queue.start_at)
+        tk.Entry(qrun, textvariable=self._queue_at_var, width=7,
+                 font=(self._bf, 10), bg=_t("INP_BG"), fg=_t("FG"),
+                 insertbackground=_t("ACCENT"), relief="flat",
+                 highlightthickness=1,
+                 highlightbackground=_t("BORDER")).pack(side="left",
+                                                        padx=(8, 0))
+        self._queue_run_btn = ttk.Button(qrun, text="  Run Queue  ",
+                                         style="Accent.TButton",
+                                         command=self._run_queue)
+        self._queue_run_btn.pack(side="right")
+
+        self._refresh_queue_list()
+
     # ============================================================
     # Statistics Tab
     # ============================================================
@@ -1284,7 +4075,9 @@ class App:
         hrow = ttk.Frame(hist_card, style="Card.TFrame")
         hrow.pack(fill="x", padx=16, pady=(12, 4))
         for text, w in [("Date", 18), ("Characters", 12),
-                        ("Time", 10), ("Mode", 10), ("Repeats", 8)]:
+                        ("Time", 10), ("Mode", 10), ("Repeats", 8),
+                        ("p50/p95/p99 ms", 18), ("Stall", 9),
+                        ("c/s (target)", 14)]:
             ttk.Label(hrow, text=text, style="Head.TLabel",
                       width=w).pack(side="left")
 
@@ -1331,6 +4124,20 @@ class App:
                       style="Body.TLabel", width=10).pack(side="left")
             ttk.Label(r, text=str(sess.get("repeat", 1)),
                       style="Body.TLabel", width=8).pack(side="left")
+            if "p50" in sess:
+                lat = ("%.1f" % sess["p50"] + " / " + "%.1f" % sess["p95"]
+                       + " / " + "%.1f" % sess["p99"])
+                stall = "%.0f" % sess["stall"] + " ms"
+                rate = ("%.1f" % sess["cps"] + " ("
+                        + "%.1f" % sess["target_cps"] + ")")
+            else:
+                lat = stall = rate = "--"
+            ttk.Label(r, text=lat, style="Body.TLabel",
+                      width=18).pack(side="left")
+            ttk.Label(r, text=stall, style="Body.TLabel",
+                      width=9).pack(side="left")
+            ttk.Label(r, text=rate, style="Body.TLabel",
+                      width=14).pack(side="left")
 
     def _clear_history(self):
         if messagebox.askyesno("Clear History",
@@ -1379,6 +4186,8 @@ class App:
              "  - Type directly into the text area\n"
              "  - Click 'Paste' to paste from your clipboard\n"
              "  - Click 'Open' to load a text file (Ctrl+O)\n"
+             "  - Click 'Type File' to type a large file straight from\n"
+             "    disk with the current settings, without loading it\n"
              "  - Load a saved preset from the Presets dropdown\n"
              "  - Use 'Recent' to quickly re-open previous files\n\n"
              "The stats bar shows character/word/line count and ETA."),
@@ -1388,11 +4197,25 @@ class App:
              "  Typing Mode:\n"
              "    Constant  -- Fixed delay between each character\n"
              "    Human-like -- Random variation with pauses at punctuation\n"
-             "    Burst -- Fast bursts of 3-8 chars with micro-pauses\n\n"
+             "    Burst -- Fast bursts of 3-8 chars with micro-pauses\n"
+             "    Learned -- Replays your own rhythm, recorded under\n"
+             "      Settings > Learned Timing by typing in the editor\n"
+             "    Instant -- Paste the text in chunks through the clipboard;\n"
+             "      your clipboard is restored afterwards\n\n"
              "  Speed Presets: Click Slow/Normal/Fast/Blazing for one-click setup.\n\n"
              "  Countdown: Time before typing starts (1-30 seconds).\n"
              "  Typing Delay: Milliseconds per character (5-300ms).\n"
-             "  Randomness: Variation in Human-like mode (0-100%)."),
+             "  Randomness: Variation in Human-like mode (0-100%).\n"
+             "  Random seed: 0 gives new timing every run; any other value\n"
+             "    replays exactly the same timing; the log shows its\n"
+             "    exact length when the session starts.\n"
+             "  Target WPM: 0 = off. Otherwise the delay follows the\n"
+             "    measured typing rate and is corrected as it runs, so\n"
+             "    the session lands on the target however slow the\n"
+             "    target app is; the mode's variation is kept.\n"
+             "  Backend Calibration: times how long this system takes\n"
+             "    to send each kind of key (ASCII, shifted, Unicode,\n"
+             "    emoji, newline) so the ETA allows for slow keys."),
 
             ("Start Typing",
              "Click 'Start Typing' at the bottom (or Ctrl+Enter).\n\n"
@@ -1402,13 +4225,31 @@ class App:
              "  - The cursor must be where you want text to appear\n\n"
              "The app auto-minimises if that option is enabled."),
 
+            ("Typing Queue",
+             "Use the Queue tab to type several texts in one go:\n\n"
+             "  - Add the editor text, the selected preset or a file;\n"
+             "    each job keeps the current Settings (mode, speed,\n"
+             "    repeat and options)\n"
+             "  - Reorder with Up / Down, or Remove jobs\n"
+             "  - Set a gap between jobs and an optional start time\n"
+             "  - Click 'Run Queue'; Stop halts the whole queue\n\n"
+             "Finished jobs leave the queue; the rest is kept for the\n"
+             "next run, even after restarting the app."),
+
             ("Control Typing",
              "While typing is in progress:\n\n"
              "  Pause / Resume: Click the orange Pause button\n"
              "  Stop: Click the red Stop button\n"
-             "  Emergency Stop: Press F9 on your keyboard\n\n"
+             "  Emergency Stop: Press F9 on your keyboard\n"
+             "  Separate process: Settings > Type in a separate process\n"
+             "    keeps timing steady while the window is busy\n"
+             "  Scripts: Settings > Local control API accepts JSON\n"
+             "    commands (submit, pause, stop, events...); see README\n\n"
              "Progress, elapsed time, and ETA are displayed.\n"
-             "WPM (words per minute) is shown in real time."),
+             "WPM (words per minute) is shown in real time.\n\n"
+             "If a session is stopped, fails or the app is closed,\n"
+             "'Resume Session' continues exactly where it left off\n"
+             "(same text and settings; refused if the text changed)."),
 
             ("Find & Replace",
              "Press Ctrl+F to open the Find & Replace bar.\n\n"
@@ -1444,8 +4285,18 @@ class App:
              "  Skip empty lines: Ignore blank lines\n"
              "  Trim trailing spaces: Remove trailing spaces per line\n"
              "  Shift+Enter: Use Shift+Enter for newlines (chat apps)\n"
+             "  Unicode injection: Send every character as a Unicode key\n"
+             "    event; fewer events, independent of keyboard layout\n"
+             "    (Windows; best for browsers and chat apps)\n"
              "  Auto-save draft: Restore your last text on next startup\n"
              "  Show progress in title: Update title bar during typing\n"
+             "  Keystroke timing trace: Save when each key was due, sent\n"
+             "    and how long it took (traces/); open it with\n"
+             "    'Open Trace' in the Live Log tab to see jitter and\n"
+             "    stalls, or replay it\n"
+             "  Profile the next: Run the next typing session, Replace\n"
+             "    All, text transform or app startup under cProfile and\n"
+             "    tracemalloc; report in profiles/, summary in the log\n"
              "  Repeat: Type the same text multiple times (1-99)"),
 
             ("Keyboard Shortcuts",
@@ -1464,7 +4315,10 @@ class App:
              "The Statistics tab tracks your usage over time:\n\n"
              "  - Total sessions, characters typed, total time\n"
              "  - Average typing speed (characters per second)\n"
-             "  - Full session history with date, chars, time, mode\n\n"
+             "  - Full session history with date, chars, time, mode\n"
+             "  - Per session: inter-key latency p50/p95/p99, the\n"
+             "    largest stall behind schedule, and achieved vs\n"
+             "    target characters per second\n\n"
              "Data is saved between sessions in .history.json."),
 
             ("Tips & Best Practices",
@@ -1543,6 +4397,12 @@ class App:
                                     command=self._stop)
         self._stop_btn.pack(side="left", padx=(8, 0))
 
+        self._resume_btn = ttk.Button(bf, text="  Resume Session  ",
+                                      style="Card.TButton",
+                                      command=self._resume)
+        self._resume_btn.pack(side="left", padx=(8, 0))
+        self._update_resume_btn()
+
         # Progress area
         pf = ttk.Frame(inner, style="Card.TFrame")
         pf.pack(side="right")
@@ -1643,6 +4503,7 @@ class App:
         v = int(float(val))
         self._rand_var.set(v)
         self._rand_lbl.configure(text=str(v) + "%")
+        self._update_eta()
 
     def _toggle_aot(self):
         self.root.attributes("-topmost", self._aot_var.get())
@@ -1668,6 +4529,146 @@ class App:
         except Exception:
             pass
 
+    # ============================================================
+    # Backend Calibration
+    # ============================================================
+    def _calibrate(self):
+        """Measure the backend's per-key cost in a scratch window."""
+        if self._typing or self._queue_active:
+            self._status("Already typing!", _t("YELLOW"))
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Calibrating")
+        win.geometry("460x220")
+        win.configure(bg=_t("CARD"))
+        win.transient(self.root)
+        ttk.Label(win, text="Measuring " + type(self.backend).__name__
+                  + " -- keep this window focused.",
+                  style="Head.TLabel").pack(pady=(14, 6))
+        box = tk.Text(win, height=6, font=(self._mf, 10), bg=_t("INP_BG"),
+                      fg=_t("FG"), insertbackground=_t("ACCENT"),
+                      relief="flat", highlightthickness=1,
+                      highlightbackground=_t("BORDER"))
+        box.pack(fill="both", expand=True, padx=14, pady=(0, 14))
+        win.lift()
+        win.focus_force()
+        box.focus_set()
+
+        self.stop_event.clear()
+        self._ckpt = None
+        self._typing = True
+        self._start_btn.state(["disabled"])
+        self._status("Calibrating backend... Stop cancels.", _t("CYAN"))
+        costs = KeyCosts()
+
+        def run():
+            err = None
+            ok = False
+            try:
+                ok = costs.measure(self.backend, stop_event=self.stop_event)
+            except Exception as exc:
+                err = exc
+            finally:
+                try:
+                    self.backend.release_modifiers()
+                    self.backend.flush()
+                except Exception:
+                    pass
+            self.root.after(0, lambda: self._calibrate_done(
+                win, costs, ok, err))
+        # Let the window map and take focus first
+        self.root.after(400, lambda: threading.Thread(
+            target=run, daemon=True).start())
+
+    def _calibrate_done(self, win, costs, ok, err):
+        self._typing = False
+        self._start_btn.state(["!disabled"])
+        try:
+            win.destroy()
+        except tk.TclError:
+            pass
+        if err is not None:
+            self._status("Calibration failed.", _t("RED"))
+            self._log_msg("Calibration failed: " + str(err), "error")
+            return
+        if not ok:
+            self._status("Calibration cancelled.", _t("YELLOW"))
+            return
+        name = type(self.backend).__name__
+        self.key_costs = costs
+        table = dict(self.settings["backend_costs"])
+        table[name] = costs.cost
+        self.settings["backend_costs"] = table
+        self.settings.save()
+        self._cal_update_label()
+        self._update_eta()
+        self._log_msg("Calibrated " + name + ": " + costs.describe()
+                      + " per key", "success")
+        self._status("Backend calibrated.", _t("GREEN"))
+
+    def _cal_update_label(self):
+        name = type(self.backend).__name__
+        if self.key_costs:
+            self._cal_lbl.configure(text=self.key_costs.describe())
+        else:
+            self._cal_lbl.configure(text="Not calibrated for " + name)
+
+    # ============================================================
+    # Learned Timing Recorder
+    # ============================================================
+    def _rec_toggle(self):
+        if self._rec_active:
+            self._rec_active = False
+            self.bigrams.save()
+            self._rec_btn.configure(text="Record")
+            self._log_msg("Timing recording saved ("
+                          + str(self.bigrams.samples) + " samples).", "success")
+            self._status("Learned timing saved.", _t("GREEN"))
+        else:
+            self._rec_active = True
+            self._rec_prev = None
+            self._rec_btn.configure(text="Stop & Save")
+            self.nb.select(self._tab_editor)
+            self.textbox.focus_set()
+            self._status("Recording your typing rhythm -- type in the editor.",
+                         _t("ORANGE"))
+        self._rec_update_label()
+
+    def _rec_reset(self):
+        if messagebox.askyesno("Reset Learned Timing",
+                               "Delete all recorded typing timing?"):
+            self.bigrams.clear()
+            self.bigrams.save()
+            self._rec_update_label()
+            self._log_msg("Learned timing reset.", "warn")
+
+    def _rec_key(self, event):
+        """Editor key hook: record the interval since the previous key."""
+        if not self._rec_active:
+            return
+        ch = "\n" if event.char == "\r" else event.char
+        if not ch:
+            return  # bare modifier
+        now = time.perf_counter()
+        if ch < " " and ch not in "\n\t":
+            self._rec_prev = None  # Backspace etc. break the rhythm
+            return
+        if self._rec_prev is not None:
+            self.bigrams.add(self._rec_prev, ch, now - self._rec_last)
+        self._rec_prev = ch
+        self._rec_last = now
+
+    def _rec_update_label(self):
+        n = self.bigrams.samples
+        if n:
+            txt = (self._fmt_number(n) + " samples | avg "
+                   + str(int(self.bigrams.avg * 1000)) + " ms/key")
+        else:
+            txt = "Nothing recorded yet (Learned mode uses Human-like)"
+        if self._rec_active:
+            txt = "Recording... " + txt
+        self._rec_lbl.configure(text=txt)
+
     # ============================================================
     # Find & Replace
     # ============================================================
@@ -1768,6 +4769,8 @@ class App:
 
     def _replace_all(self):
         """Replace all occurrences."""
+        if self._profile_armed("Replace All"):
+            return self._profiled("Replace All", self._replace_all)
         term = self._find_var.get()
         repl = self._replace_var.get()
         if not term:
@@ -1789,6 +4792,8 @@ class App:
     # ============================================================
     def _xform_apply(self, fn):
         """Apply a transform function to the text."""
+        if self._profile_armed("Text transform"):
+            return self._profiled("Text transform", self._xform_apply, fn)
         sel = False
         try:
             start = self.textbox.index("sel.first")
@@ -1915,36 +4920,50 @@ class App:
         self._update_eta()
 
     def _update_eta(self):
+        """Refresh Est. Time once edits and slider moves settle."""
+        if self._eta_job is not None:
+            self.root.after_cancel(self._eta_job)
+        self._eta_job = self.root.after(self.ETA_DELAY_MS, self._refresh_eta)
+
+    def _refresh_eta(self):
+        # Mean timing only: the exact total of a seeded run means building
+        # its whole schedule, which the session log reports at start.
+        self._eta_job = None
         text = self.textbox.get("1.0", "end-1c")
         chars = len(text)
         if chars == 0:
             self._stat_frames["eta"].configure(text="--")
             return
-        delay_ms = self._sp_var.get()
-        repeat = self._repeat_var.get()
-        total_s = (chars * delay_ms / 1000.0) * repeat + self._cd_var.get()
+        try:
+            repeat = max(1, self._repeat_var.get())
+            wpm = max(0, self._wpm_var.get())
+            chunk = max(1, self._paste_chunk_var.get())
+            paste_delay = self._paste_delay_var.get() / 1000.0
+        except tk.TclError:
+            return
+        mode = self._mode_var.get()
+        blocks = self._make_source(text).blocks()
+        if mode == "paste":
+            per_pass = sum(math.ceil(len(b) / chunk)
+                           for b in blocks) * paste_delay
+        else:
+            engine = DelayEngine(mode, self._sp_var.get() / 1000.0,
+                                 self._rand_var.get() / 100.0, None,
+                                 self.bigrams)
+            per_pass = 0.0
+            for b in blocks:
+                if wpm:
+                    # Target WPM already paces around the backend cost
+                    t = len(b) * 12.0 / wpm
+                else:
+                    t = engine.expected_total(b)
+                    if self.key_costs:
+                        # Keys slower than their delay stretch the session
+                        t = self.key_costs.estimate(b, t)
+                per_pass += t
+        total_s = per_pass * repeat + (repeat - 1) + self._cd_var.get()
         self._stat_frames["eta"].configure(text=self._fmt_time(total_s))
 
-    def _fmt_time(self, seconds):
-        seconds = float(seconds)
-        if seconds < 60:
-            return str(int(seconds)) + "s"
-        m = int(seconds) // 60
-        sc = int(seconds) % 60
-        if m < 60:
-            return str(m) + "m " + str(sc) + "s"
-        h = m // 60
-        m = m % 60
-        return str(h) + "h " + str(m) + "m"
-
-    def _fmt_number(self, n):
-        """Format a number with thousand separators."""
-        if n < 1000:
-            return str(n)
-        if n < 1000000:
-            return str(n // 1000) + "," + str(n % 1000).zfill(3)
-        return str(n // 1000000) + "," + str((n // 1000) % 1000).zfill(3) + "," + str(n % 1000).zfill(3)
-
     # ============================================================
     # File I/O
     # ============================================================
@@ -1985,6 +5004,20 @@ class App:
                 messagebox.showerror("Error",
                                      "Could not save file:\n" + str(exc))
 
+    def _type_file(self):
+        """Type a file straight from disk, without loading the editor."""
+        if self._typing:
+            self._status("Already typing!", _t("YELLOW"))
+            return
+        path = filedialog.askopenfilename(
+            title="Type Text File",
+            filetypes=[("Text files", "*.txt"),
+                       ("Markdown", "*.md"),
+                       ("All files", "*.*")])
+        if path:
+            self._add_recent(path)
+            self._start(path)
+
     def _add_recent(self, path):
         """Add a file to the recent files list."""
         recent = self.settings["recent_files"]
@@ -2131,6 +5164,7 @@ class App:
             self._log.see("end")
             self._log.configure(state="disabled")
         self.root.after(0, _do)
+        self._publish({"event": "log", "text": msg, "tag": tag})
 
     def _clear_log(self):
         self._log.configure(state="normal")
@@ -2152,6 +5186,118 @@ class App:
                 messagebox.showerror("Error",
                                      "Could not export log:\n" + str(exc))
 
+    def _trace_open(self):
+        path = filedialog.askopenfilename(
+            title="Open Keystroke Trace",
+            initialdir=TRACE_DIR if os.path.isdir(TRACE_DIR) else APP_DIR,
+            filetypes=[("Keystroke traces", "*.bin"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            trace = KeystrokeTrace.load(path)
+        except (OSError, ValueError, struct.error) as exc:
+            messagebox.showerror("Error", "Could not open trace:\n" + str(exc))
+            return
+        self._trace_stop.set()
+        self._trace = trace
+        st = trace.summary()
+        meta = trace.meta
+        info = [os.path.basename(path), str(st["steps"]) + " keys"]
+        if meta.get("mode"):
+            info.append(meta["mode"] + " "
+                        + "%.0f" % (meta.get("delay", 0) * 1000) + " ms")
+        if meta.get("backend"):
+            info.append(meta["backend"])
+        if st["steps"]:
+            info.append("late p50 " + "%.2f" % st["late_p50"] + " / p99 "
+                        + "%.2f" % st["late_p99"] + " / max "
+                        + "%.1f" % st["late_max"] + " ms")
+            info.append("jitter " + "%.2f" % st["jitter"] + " ms")
+            info.append("call " + "%.3f" % st["cost_mean"] + " ms avg")
+            info.append(str(st["stalls"]) + " stalls")
+        self._trace_lbl.configure(text="  |  ".join(info))
+        self._trace_frame.pack(fill="x", padx=14, pady=(0, 6),
+                               before=self._log_wrap)
+        self._trace_draw()
+
+    def _trace_close(self):
+        self._trace_stop.set()
+        self._trace = None
+        self._trace_frame.pack_forget()
+
+    def _trace_draw(self):
+        """Plot how late each keystroke was (bars, red past a stall) and
+        the backend call time (dots), one column per group of keys."""
+        cv = self._trace_cv
+        cv.delete("all")
+        trace = self._trace
+        if trace is None or not trace.n:
+            return
+        w = max(1, cv.winfo_width() - 4)
+        h = max(1, cv.winfo_height() - 4)
+        n = trace.n
+        cols = min(w, n)
+        late = [0.0] * cols
+        cost = [0.0] * cols
+        for i, x in enumerate(trace.lateness()):
+            c = i * cols // n
+            if x > late[c]:
+                late[c] = x
+            if trace.cost[i] > cost[c]:
+                cost[c] = trace.cost[i]
+        top = max(max(late), max(cost), 0.001)
+        scale = (h - 14) / top
+        step = w / cols
+        for c in range(cols):
+            x = 2 + c * step
+            color = _t("RED") if late[c] > trace.STALL else _t("FG3")
+            cv.create_line(x, h, x, h - late[c] * scale, fill=color,
+                           width=max(1, int(step)))
+            y = h - cost[c] * scale
+            cv.create_line(x, y, x + max(1, step), y, fill=_t("ACCENT"))
+        cv.create_text(6, 4, anchor="nw", fill=_t("FG3"),
+                       font=(self._bf, 8),
+                       text="lateness (bars) / call time (line), max "
+                            + "%.1f" % (top * 1000) + " ms")
+
+    def _trace_replay(self):
+        """Replay the open trace through a recording backend and log how
+        closely the replay followed the recorded timeline."""
+        orig = self._trace
+        if orig is None or not orig.n:
+            return
+        if self._trace_thread and self._trace_thread.is_alive():
+            # Sharing the stop event, a second replay could not be told
+            # apart from the first (and Stop would have to end both)
+            self._log_msg("A trace replay is already running.", "warn")
+            return
+        self._trace_stop.clear()
+        self._log_msg("Replaying trace (" + self._fmt_time(
+            orig.planned[orig.n - 1]) + ")...", "accent")
+
+        def run():
+            rep = orig.replay(RecordingBackend(), self._trace_stop)
+            if rep.n < orig.n:
+                self._log_msg("Trace replay stopped after " + str(rep.n)
+                              + " keystrokes.", "warn")
+                return
+            # Both run on the same planned timeline, so this is how much
+            # the recorded lateness differs from the replay's
+            diff = sorted(abs(rep.sent[i] - orig.sent[i])
+                          for i in range(rep.n))
+            a, b = orig.summary(), rep.summary()
+            self._log_msg("Trace replay: " + str(rep.n) + " keystrokes, "
+                          "sent times differ from the recording by "
+                          + "%.3f" % (diff[rep.n // 2] * 1000)
+                          + " ms median, " + "%.3f" % (diff[-1] * 1000)
+                          + " ms max", "success")
+            self._log_msg("  Lateness p99 " + "%.2f" % a["late_p99"]
+                          + " ms recorded vs " + "%.2f" % b["late_p99"]
+                          + " ms replayed; jitter " + "%.2f" % a["jitter"]
+                          + " vs " + "%.2f" % b["jitter"] + " ms", "dim")
+        self._trace_thread = threading.Thread(target=run, daemon=True)
+        self._trace_thread.start()
+
     # ============================================================
     # Status / Progress
     # ============================================================
@@ -2159,8 +5305,10 @@ class App:
         self.root.after(0, lambda: self._status_lbl.configure(text=msg))
         if color:
             self.root.after(0, lambda: self._dot.configure(fg=color))
+        self._publish({"event": "status", "text": msg})
 
     def _set_progress(self, pct):
+        self._live[0] = pct
         def _do():
             self._progress.configure(value=pct)
             self._pct_lbl.configure(text=str(int(pct)) + "%")
@@ -2173,6 +5321,7 @@ class App:
         self.root.after(0, lambda: self._elapsed_lbl.configure(text=text))
 
     def _set_wpm(self, chars, elapsed):
+        self._live[1], self._live[2] = chars, elapsed
         if elapsed > 0:
             words = chars / 5.0  # standard: 5 chars = 1 word
             wpm = int(words / (elapsed / 60.0))
@@ -2228,6 +5377,7 @@ class App:
                            activebackground=_t("ACCENT"))
 
         self._dot.configure(bg=_t("CARD"))
+        self._trace_draw()
 
         # Title bar colour on Windows
         if SYSTEM == "Windows":
@@ -2280,6 +5430,9 @@ class App:
                         if old_fg == THEMES[tn][key].lower():
                             widget.configure(fg=_t(key))
                             break
+            elif cls == "Listbox":
+                widget.configure(bg=_t("INP_BG"), fg=_t("FG"),
+                                 selectbackground=_t("ACCENT"))
             elif cls == "Scrollbar":
                 widget.configure(bg=_t("CARD"), troughcolor=_t("INP_BG"))
             elif cls == "Canvas":
@@ -2302,60 +5455,441 @@ class App:
     # ============================================================
     # Actions
     # ============================================================
-    def _start(self):
-        if self._typing:
+    def _start(self, path=None, resume=None, source=None, opts=None,
+               countdown=None):
+        if self._typing or self._queue_active:
             self._status("Already typing!", _t("YELLOW"))
             return
 
-        raw = self.textbox.get("1.0", "end").rstrip("\n")
-        if not raw.strip():
-            self._status("Please enter or paste some text first.", _t("YELLOW"))
-            self._log_msg("Start aborted: no text.", "warn")
-            return
-
-        text = raw
-        if self._trim_var.get():
-            text = "\n".join(line.rstrip() for line in text.split("\n"))
-        if self._skip_nl_var.get():
-            text = "\n".join(l for l in text.split("\n") if l.strip())
-
-        countdown = self._cd_var.get()
-        delay_ms = self._sp_var.get()
-        mode = self._mode_var.get()
-        randomness = self._rand_var.get() / 100.0
-        repeat = max(1, self._repeat_var.get())
+        if source is not None:
+            text = source
+        elif path:
+            try:
+                text = self._make_source(path=path)
+            except OSError as exc:
+                messagebox.showerror("Error",
+                                     "Could not open file:\n" + str(exc))
+                return
+            if not text.size:
+                self._status("The file is empty.", _t("YELLOW"))
+                self._log_msg("Start aborted: empty file.", "warn")
+                return
+        else:
+            raw = self.textbox.get("1.0", "end-1c")
+            if not re.search(r"\S", raw):
+                self._status("Please enter or paste some text first.",
+                             _t("YELLOW"))
+                self._log_msg("Start aborted: no text.", "warn")
+                return
+            text = self._make_source(raw)
 
         self.stop_event.clear()
         self.pause_event.clear()
+        self._stop_at = 0.0
+        self.error = None
+        self.trace_keys = self._trace_var.get()
         self._typing = True
         self._paused = False
+        self._begin_typing_ui()
+
+        job = self._type_job
+        args = self._session_args(
+            text, opts or self._ui_options(), path,
+            self._cd_var.get() if countdown is None else countdown, resume)
+        if self._engine_wanted(args[3]):
+            job, args = self._engine_job, (
+                args, self._profile_armed("Typing session"))
+        elif self._profile_armed("Typing session"):
+            job, args = self._profiled, ("typing session", job) + args
+        self.worker = threading.Thread(target=job, args=args, daemon=True)
+        self.worker.start()
+        self._publish({"event": "started", "name": text.name,
+                       "size": text.size})
+
+    def _begin_typing_ui(self):
         self._start_btn.state(["disabled"])
         self._pause_btn.state(["!disabled"])
+        self._resume_btn.state(["disabled"])
         self._set_progress(0)
 
-        self.backend.shift_enter = self._shift_enter_var.get()
+    def _ui_options(self):
+        """The typing options set in the Settings tab, as stored with
+        checkpoints and queued jobs."""
+        try:
+            seed = self._seed_var.get()
+        except tk.TclError:
+            seed = 0
+        try:
+            target_wpm = max(0, self._wpm_var.get())
+        except tk.TclError:
+            target_wpm = 0
+        try:
+            chunk = max(1, self._paste_chunk_var.get())
+            paste_delay = max(0, self._paste_delay_var.get())
+        except tk.TclError:
+            chunk, paste_delay = 2000, 150
+        return {"mode": self._mode_var.get(),
+                "delay": self._sp_var.get(),
+                "randomness": self._rand_var.get(),
+                "repeat": max(1, self._repeat_var.get()),
+                "seed": seed,
+                "target_wpm": target_wpm,
+                "trim": self._trim_var.get(),
+                "skip_empty": self._skip_nl_var.get(),
+                "shift_enter": self._shift_enter_var.get(),
+                "unicode_only": self._unicode_var.get(),
+                "paste_chunk": chunk,
+                "paste_delay": paste_delay}
+
+    def _apply_options(self, o):
+        """Show options from a checkpoint in the Settings tab."""
+        self._mode_var.set(o["mode"])
+        self._sp_var.set(o["delay"])
+        self._sp_lbl.configure(text=str(o["delay"]) + " ms")
+        self._rand_var.set(o["randomness"])
+        self._rand_lbl.configure(text=str(o["randomness"]) + "%")
+        self._repeat_var.set(o["repeat"])
+        self._seed_var.set(o["seed"])
+        self._wpm_var.set(o.get("target_wpm", 0))
+        self._trim_var.set(o["trim"])
+        self._skip_nl_var.set(o["skip_empty"])
+        self._shift_enter_var.set(o["shift_enter"])
+        self._unicode_var.set(o["unicode_only"])
+        self._paste_chunk_var.set(o["paste_chunk"])
+        self._paste_delay_var.set(o["paste_delay"])
+
+    def _session_args(self, text, opts, path, countdown, resume=None):
+        """Set up the backend for opts, log the session header and return
+        the arguments for _type_job."""
+        mode = opts["mode"]
+        delay_ms = opts["delay"]
+        randomness = opts["randomness"] / 100.0
+        repeat = opts["repeat"]
+        seed = opts["seed"] or None
+        target_wpm = opts.get("target_wpm", 0) if mode != "paste" else 0
+        # Only what changes the compiled keys; the key already hashes
+        # the filtered text, and delays are not part of a plan
+        cache_opts = (opts["shift_enter"], opts["unicode_only"])
+        paste_opts = (opts["paste_chunk"], opts["paste_delay"] / 1000.0)
+
+        self.backend.shift_enter = opts["shift_enter"]
+        self.backend.unicode_only = (self.backend.unicode_supported
+                                     and opts["unicode_only"])
 
         self._log_msg("Starting typing session", "accent")
-        self._log_msg("  Mode: " + mode + " | Delay: " + str(delay_ms)
-                      + "ms | Rand: " + str(int(randomness * 100))
+        self._log_msg("  Mode: " + mode + " | Delay: "
+                      + (str(target_wpm) + " WPM" if target_wpm
+                         else str(delay_ms) + "ms")
+                      + " | Rand: " + str(opts["randomness"])
                       + "% | Repeat: " + str(repeat) + "x", "dim")
-        self._log_msg("  Text: " + str(len(text)) + " chars", "dim")
+        if path:
+            self._log_msg("  File: " + text.name + " | "
+                          + self._fmt_number(text.size) + " bytes, streamed"
+                          + " | Backend: " + type(self.backend).__name__,
+                          "dim")
+        else:
+            self._log_msg("  Text: " + str(text.size) + " chars | Backend: "
+                          + type(self.backend).__name__, "dim")
+        if seed is not None:
+            self._log_msg("  Seed: " + str(seed), "dim")
         if self.backend.shift_enter:
             self._log_msg("  Newlines: Shift+Enter (chat-safe)", "dim")
         else:
             self._log_msg("  Newlines: plain Enter", "dim")
+        if self.backend.unicode_only:
+            self._log_msg("  Injection: Unicode (layout independent)", "dim")
+
+        ck = dict(opts, key=text.digest(), path=path or "", rep=0, offset=0)
+        if resume:
+            ck["rep"] = resume["rep"]
+            ck["offset"] = resume["offset"]
+            self._log_msg("  Resuming at pass " + str(ck["rep"] + 1)
+                          + ", char " + self._fmt_number(ck["offset"]),
+                          "cyan")
+        self._ckpt = ck
+        return (text, countdown, delay_ms / 1000.0, mode, randomness, repeat,
+                cache_opts, paste_opts, seed, ck, target_wpm)
+
+    def _resume(self):
+        """Continue the last interrupted session where it stopped."""
+        if self._typing or self._queue_active:
+            self._status("Already typing!", _t("YELLOW"))
+            return
+        ck = self.checkpoints.load()
+        if not ck:
+            self._status("No interrupted session to resume.", _t("YELLOW"))
+            return
+        opts = (ck["trim"], ck["skip_empty"])
+        try:
+            if ck["path"]:
+                src = self._make_source(path=ck["path"], opts=opts)
+            else:
+                src = self._make_source(self.textbox.get("1.0", "end-1c"),
+                                        opts=opts)
+            same = src.digest() == ck["key"]
+        except OSError:
+            same = False
+        if not same:
+            what = ("The file " + os.path.basename(ck["path"])
+                    if ck["path"] else "The editor text")
+            messagebox.showwarning(
+                "Cannot Resume",
+                what + " has changed since the session was interrupted,"
+                " so it cannot be resumed exactly.")
+            self._log_msg("Resume refused: text changed.", "warn")
+            return
 
-        self.worker = threading.Thread(
-            target=self._type_job,
-            args=(text, countdown, delay_ms / 1000.0,
-                  mode, randomness, repeat),
-            daemon=True)
-        self.worker.start()
+        # Continue with the settings the session was started with
+        self._apply_options(ck)
+        self._start(ck["path"] or None, ck)
+
+    def _profile_armed(self, target):
+        """True, once, if profiling is armed for target."""
+        if self._prof_var.get() and self._prof_target_var.get() == target:
+            self._prof_var.set(False)
+            return True
+        return False
+
+    # ============================================================
+    # Engine Process
+    # ============================================================
+    def _engine_wanted(self, mode):
+        # Instant mode pastes through the Tk clipboard, so it stays here
+        return self.use_engine and mode != "paste"
+
+    def _engine_toggle(self):
+        self.use_engine = self._engine_var.get()
+        if not self.use_engine and self._engine and not self._engine_busy:
+            self._engine.close()
+            self._engine = None
+
+    def _engine_job(self, args, profile=False):
+        """Worker: run _type_job(*args) in the engine process, relaying
+        its log, status and result to the UI until it finishes."""
+        mode, repeat = args[3], args[5]
+        self._ckpt = None    # the engine keeps and saves the live one
+        finished = False
+        try:
+            if self._engine is None or not self._engine.alive():
+                self._log_msg("  Starting typing engine process...", "dim")
+                self._engine = EngineProcess()
+            eng = self._engine
+            self._log_msg("  Engine: process " + str(eng.proc.pid)
+                          + " | Backend: " + eng.backend_name, "dim")
+            eng.start(args, {"theme": _current_theme,
+                             "shift_enter": self.backend.shift_enter,
+                             "unicode_only": self.backend.unicode_only,
+                             "trace": self.trace_keys,
+                             "key_costs": self.key_costs.cost
+                             if self.key_costs else None,
+                             "bigrams": self.bigrams}, profile)
+            self._engine_busy = True
+            # Stop or Pause pressed while the engine was starting
+            if self.stop_event.is_set():
+                eng.stop(self._stop_at)
+            elif self._paused:
+                eng.pause()
+            self.root.after(0, self._engine_poll)
+            while True:
+                msg = eng.recv()
+                if msg[0] == "call" and msg[1] in EngineProcess.RELAY:
+                    getattr(self, msg[1])(*msg[2])
+                elif msg[0] == "finish":
+                    self._engine_busy = False
+                    finished = True
+                    self.latency = msg[2]
+                    self.error = (RuntimeError(msg[3]) if msg[3] is not None
+                                  else None)
+                    self.outcome = msg[4]
+                    self.root.after(0, self._engine_show)
+                    self._finish(*msg[1])
+                elif msg[0] == "done":
+                    self.last_trace = msg[1] or self.last_trace
+                    break
+        except Exception as exc:
+            self.error = exc
+            if self._engine is not None and not self._engine.alive():
+                self._engine = None
+            if not finished:
+                self.outcome = self.ERROR
+                self._finish("Error: typing engine: " + str(exc), _t("RED"),
+                             0, mode, repeat)
+        finally:
+            self._engine_busy = False
+
+    def _engine_poll(self):
+        """Tk thread: show the engine's progress block while it types."""
+        if self._engine_busy:
+            self._engine_show()
+            self.root.after(self.ENGINE_POLL_MS, self._engine_poll)
+
+    def _engine_show(self):
+        eng = self._engine
+        if eng is None:
+            return
+        pct, chars, elapsed, left = eng.block
+        self._set_progress(int(pct))
+        if elapsed > 0:
+            self._set_eta(elapsed, left)
+            self._set_wpm(chars, elapsed)
+
+    # ============================================================
+    # Control API
+    # ============================================================
+    API_OPTIONS = {"mode": str, "delay": int, "randomness": int,
+                   "repeat": int, "seed": int, "target_wpm": int,
+                   "trim": bool, "skip_empty": bool, "shift_enter": bool,
+                   "unicode_only": bool, "paste_chunk": int,
+                   "paste_delay": int}
+
+    def _control_toggle(self):
+        if self._ctl_var.get() and self.control is None:
+            server = ControlServer(self)
+            try:
+                server.start()
+            except Exception as exc:
+                self._ctl_var.set(False)
+                self._log_msg("Control API failed to start: " + str(exc),
+                              "error")
+                return
+            self.control = server
+            self._log_msg("Control API listening on " + server.address,
+                          "accent")
+        elif not self._ctl_var.get() and self.control is not None:
+            self.control.stop()
+            self.control = None
+            self._log_msg("Control API stopped.", "dim")
+
+    def _publish(self, event):
+        if self.control is not None:
+            self.control.publish(event)
+
+    def _api_call(self, cmd, req):
+        """Control server thread: run one request on the Tk thread."""
+        return self._ui_call(lambda: self._api(cmd, req))
+
+    def _api(self, cmd, req):
+        """Tk thread: carry out a control request and return the reply
+        fields; ValueError becomes an error reply."""
+        if cmd == "status":
+            return self._api_status()
+        if cmd == "presets":
+            return {"presets": self.presets.names()}
+        if cmd == "set":
+            self._apply_options(self._api_options(req))
+            self._update_eta()
+            return {"options": self._ui_options()}
+        if cmd == "submit":
+            return self._api_submit(req)
+        if cmd == "start":
+            if self._typing or self._queue_active:
+                raise ValueError("already typing")
+            if not self.queue.jobs:
+                raise ValueError("the queue is empty")
+            self._run_queue()
+            return {"jobs": len(self.queue.jobs)}
+        if cmd in ("pause", "resume"):
+            if not self._typing:
+                raise ValueError("not typing")
+            if self._paused != (cmd == "pause"):
+                self._pause_resume()
+            return {"paused": self._paused}
+        if cmd == "stop":
+            if self._typing or self._queue_active:
+                self._stop()
+            return {}
+        raise ValueError("unknown command: " + repr(cmd))
+
+    def _api_status(self):
+        pct, chars, elapsed = self._live
+        state = "idle"
+        if self._typing:
+            state = "paused" if self._paused else "typing"
+        elif self._queue_active:
+            state = "queue"
+        return {"state": state, "queue": len(self.queue.jobs),
+                "progress": pct if self._typing else 0,
+                "chars": chars, "elapsed": round(elapsed, 3),
+                "backend": type(self.backend).__name__,
+                "options": self._ui_options()}
+
+    def _api_options(self, req):
+        """The Settings tab options with the request's overrides."""
+        o = self._ui_options()
+        for key, kind in self.API_OPTIONS.items():
+            if key not in req:
+                continue
+            val = req[key]
+            if type(val) is not kind:
+                raise ValueError(key + " must be " + kind.__name__)
+            o[key] = val
+        if o["mode"] not in ("normal", "human", "burst", "learned",
+                             "paste"):
+            raise ValueError("unknown mode: " + repr(o["mode"]))
+        if o["delay"] < 1 or o["repeat"] < 1 or o["paste_chunk"] < 1:
+            raise ValueError("delay, repeat and paste_chunk must be >= 1")
+        if not 0 <= o["randomness"] <= 100:
+            raise ValueError("randomness must be 0-100")
+        if o["target_wpm"] < 0 or o["paste_delay"] < 0 or o["seed"] < 0:
+            raise ValueError("target_wpm, paste_delay and seed must be"
+                             " >= 0")
+        return o
+
+    def _api_submit(self, req):
+        """Type text, a preset or a file now, or add it to the queue."""
+        kinds = [k for k in ("text", "preset", "file") if k in req]
+        if len(kinds) != 1:
+            raise ValueError("give exactly one of text, preset or file")
+        kind = kinds[0]
+        value = req[kind]
+        if not isinstance(value, str):
+            raise ValueError(kind + " must be a string")
+        o = self._api_options(req)
+        if kind == "preset" and value not in self.presets.names():
+            raise ValueError("no preset named " + repr(value))
+        if kind == "file" and not os.path.isfile(value):
+            raise ValueError("no such file: " + value)
+        if kind == "text" and not re.search(r"\S", value):
+            raise ValueError("the text is empty")
+
+        if req.get("queue"):
+            self._queue_add({"kind": kind, kind: value, "opts": o})
+            return {"queued": len(self.queue.jobs)}
+
+        if self._typing or self._queue_active:
+            raise ValueError("already typing")
+        countdown = req.get("countdown", 0)
+        if type(countdown) is not int or countdown < 0:
+            raise ValueError("countdown must be an int >= 0")
+        trim_skip = (o["trim"], o["skip_empty"])
+        try:
+            if kind == "file":
+                src = self._make_source(path=value, opts=trim_skip)
+            else:
+                raw = self.presets.get(value) if kind == "preset" else value
+                src = self._make_source(raw, opts=trim_skip)
+        except OSError as exc:
+            raise ValueError(str(exc))
+        if not src.size:
+            raise ValueError("nothing to type")
+        self._start(value if kind == "file" else None, source=src, opts=o,
+                    countdown=countdown)
+        return {"started": self._typing}
+
+    def _update_resume_btn(self):
+        if self.checkpoints.load() and not self._typing:
+            self._resume_btn.state(["!disabled"])
+        else:
+            self._resume_btn.state(["disabled"])
 
     def _stop(self):
+        if not self.stop_event.is_set():
+            self._stop_at = time.perf_counter()
         self.stop_event.set()
         if self._paused:
             self.pause_event.set()
+        if self._engine_busy:
+            self._engine.stop(self._stop_at)
         self._status("Stop requested...", _t("RED"))
         self._log_msg("Stop requested by user.", "error")
 
@@ -2365,12 +5899,16 @@ class App:
         if self._paused:
             self._paused = False
             self.pause_event.set()
+            if self._engine_busy:
+                self._engine.resume()
             self._pause_btn.configure(text="  Pause  ")
             self._status("Resumed.", _t("GREEN"))
             self._log_msg("Resumed.", "success")
         else:
             self._paused = True
             self.pause_event.clear()
+            if self._engine_busy:
+                self._engine.pause()
             self._pause_btn.configure(text="  Resume  ")
             self._status("Paused. Click Resume to continue.", _t("ORANGE"))
             self._log_msg("Paused.", "warn")
@@ -2384,6 +5922,15 @@ class App:
             else:
                 self.drafts.clear()
 
+        if self._rec_active:
+            self.bigrams.save()
+
+        self._queue_save_opts()
+
+        # The worker may not get to write its final checkpoint
+        if self._typing and self._ckpt:
+            self.checkpoints.save(self._ckpt)
+
         # Save settings
         self.settings["theme"] = _current_theme
         self.settings["countdown"] = self._cd_var.get()
@@ -2391,12 +5938,28 @@ class App:
         self.settings["randomness"] = self._rand_var.get()
         self.settings["mode"] = self._mode_var.get()
         self.settings["repeat"] = self._repeat_var.get()
+        try:
+            self.settings["seed"] = self._seed_var.get()
+        except tk.TclError:
+            self.settings["seed"] = 0
+        try:
+            self.settings["target_wpm"] = max(0, self._wpm_var.get())
+        except tk.TclError:
+            self.settings["target_wpm"] = 0
+        self.settings["paste_chunk"] = self._paste_chunk_var.get()
+        self.settings["paste_delay"] = self._paste_delay_var.get()
         self.settings["minimize"] = self._minimize_var.get()
         self.settings["notify"] = self._notify_var.get()
         self.settings["skip_empty"] = self._skip_nl_var.get()
         self.settings["shift_enter"] = self._shift_enter_var.get()
+        self.settings["unicode_only"] = self._unicode_var.get()
         self.settings["trim_trailing"] = self._trim_var.get()
         self.settings["restore_window"] = self._restore_var.get()
+        self.settings["trace"] = self._trace_var.get()
+        self.settings["engine_process"] = self._engine_var.get()
+        self.settings["control_server"] = self._ctl_var.get()
+        self.settings["profile"] = self._prof_var.get()
+        self.settings["profile_target"] = self._prof_target_var.get()
         self.settings["wrap"] = self._wrap_var.get()
         self.settings["font_size"] = self._font_size
         try:
@@ -2413,135 +5976,305 @@ class App:
         self.stop_event.set()
         if self._paused:
             self.pause_event.set()
+        if self._engine is not None:
+            # Stops the session there; the engine saves its checkpoint
+            self._engine.close()
+        if self.control is not None:
+            self.control.stop()
         self.backend.shutdown()
         self.root.destroy()
 
     # ============================================================
-    # Typing Worker Thread
+    # Queue
     # ============================================================
-    def _type_job(self, text, countdown, base_delay, mode, randomness, repeat):
-        try:
-            if self._minimize_var.get():
-                self.root.after(0, self.root.iconify)
+    def _refresh_queue_list(self):
+        sel = self._queue_list.curselection()
+        self._queue_list.delete(0, "end")
+        for n, job in enumerate(self.queue.jobs, 1):
+            mark = "> " if job is self._queue_current else "  "
+            self._queue_list.insert("end", mark + str(n) + ". "
+                                    + QueueManager.label(job))
+        if sel and sel[0] < len(self.queue.jobs):
+            self._queue_list.selection_set(sel[0])
+
+    def _queue_add(self, job):
+        self.queue.add(job)
+        self._refresh_queue_list()
+        self._log_msg("Queued: " + QueueManager.label(job), "info")
+        self._status("Added to queue (" + str(len(self.queue.jobs))
+                     + " jobs).", _t("CYAN"))
+
+    def _queue_add_text(self):
+        text = self.textbox.get("1.0", "end-1c")
+        if not text.strip():
+            self._status("The editor is empty.", _t("YELLOW"))
+            return
+        self._queue_add({"kind": "text", "text": text,
+                         "opts": self._ui_options()})
 
-            self._log_msg("Countdown: " + str(countdown) + "s", "warn")
-            for sec in range(countdown, 0, -1):
-                if self.stop_event.is_set():
-                    self._finish("Cancelled.", _t("RED"), 0, mode, repeat)
-                    return
-                self._status("Starting in " + str(sec)
-                             + "s -- focus the target!", _t("YELLOW"))
-                self._set_progress(int((countdown - sec) / countdown * 5))
-                time.sleep(1)
+    def _queue_add_preset(self):
+        name = self._preset_var.get()
+        if name not in self.presets.names():
+            self._status("Select a preset in the Editor toolbar first.",
+                         _t("YELLOW"))
+            return
+        self._queue_add({"kind": "preset", "preset": name,
+                         "opts": self._ui_options()})
 
-            total = len(text) * repeat
-            typed = 0
-            self._start_time = time.time()
+    def _queue_add_file(self):
+        path = filedialog.askopenfilename(
+            title="Queue Text File",
+            filetypes=[("Text files", "*.txt"),
+                       ("Markdown", "*.md"),
+                       ("All files", "*.*")])
+        if path:
+            self._queue_add({"kind": "file", "path": path,
+                             "opts": self._ui_options()})
 
-            for rep in range(repeat):
-                rep_lbl = ""
-                if repeat > 1:
-                    rep_lbl = " [" + str(rep + 1) + "/" + str(repeat) + "]"
-                    self._log_msg("Repeat " + str(rep + 1) + "/"
-                                  + str(repeat), "cyan")
+    def _queue_selected(self):
+        sel = self._queue_list.curselection()
+        return sel[0] if sel else None
 
-                hk = ""
-                if self.backend.hotkey_supported:
-                    hk = "  " + self.backend.hotkey_label + " to stop."
-                self._status("Typing..." + rep_lbl + hk, _t("GREEN"))
+    def _queue_move(self, step):
+        i = self._queue_selected()
+        if i is None:
+            return
+        j = self.queue.move(i, step)
+        self._refresh_queue_list()
+        self._queue_list.selection_clear(0, "end")
+        self._queue_list.selection_set(j)
+        self._queue_list.see(j)
+
+    def _queue_remove(self):
+        i = self._queue_selected()
+        if i is None:
+            return
+        job = self.queue.jobs[i]
+        if job is self._queue_current:
+            self._status("That job is running; stop it first.", _t("YELLOW"))
+            return
+        self.queue.remove(job)
+        self._refresh_queue_list()
 
-                for i, ch in enumerate(text):
-                    if self.stop_event.is_set():
-                        self._finish("Stopped after " + str(typed) + " chars.",
-                                     _t("RED"), typed, mode, repeat)
-                        return
-                    if self.backend.stop_requested():
-                        self.stop_event.set()
-                        self._finish("Stopped by " + self.backend.hotkey_label
-                                     + " after " + str(typed) + " chars.",
-                                     _t("RED"), typed, mode, repeat)
-                        return
+    def _queue_clear(self):
+        if self._queue_active:
+            self._status("Stop the queue before clearing it.", _t("YELLOW"))
+            return
+        if self.queue.jobs and messagebox.askyesno(
+                "Clear Queue", "Remove all queued jobs?"):
+            self.queue.clear()
+            self._refresh_queue_list()
 
-                    if self._paused:
-                        self.pause_event.wait()
-                        if self.stop_event.is_set():
-                            self._finish("Stopped while paused.",
-                                         _t("RED"), typed, mode, repeat)
-                            return
+    def _queue_save_opts(self):
+        try:
+            self.queue.gap = max(0, self._queue_gap_var.get())
+        except tk.TclError:
+            pass
+        self.queue.start_at = self._queue_at_var.get().strip()
+        self.queue.save()
 
-                    self.backend.type_char(ch)
-                    typed += 1
+    def _run_queue(self):
+        if self._typing or self._queue_active:
+            self._status("Already typing!", _t("YELLOW"))
+            return
+        if not self.queue.jobs:
+            self._status("The queue is empty.", _t("YELLOW"))
+            return
+        self._queue_save_opts()
+        start_at = None
+        if self.queue.start_at:
+            try:
+                t = time.strptime(self.queue.start_at, "%H:%M")
+            except ValueError:
+                messagebox.showerror("Queue",
+                                     "Start time must be HH:MM (24-hour).")
+                return
+            now = time.localtime()
+            start_at = time.mktime(now[:3] + (t.tm_hour, t.tm_min, 0)
+                                   + now[6:8] + (-1,))
+            if start_at <= time.time():
+                start_at += 86400   # tomorrow
+        self.stop_event.clear()
+        self._stop_at = 0.0
+        self.trace_keys = self._trace_var.get()
+        self._queue_active = True
+        self._queue_run_btn.state(["disabled"])
+        self._start_btn.state(["disabled"])
+        job = self._queue_job
+        args = (start_at, self.queue.gap, self._cd_var.get())
+        if self._profile_armed("Typing session"):
+            job, args = self._profiled, ("typing queue", job) + args
+        self.worker = threading.Thread(target=job, args=args, daemon=True)
+        self.worker.start()
+        self._publish({"event": "queue_started",
+                       "jobs": len(self.queue.jobs)})
+
+    def _queue_next(self):
+        """Tk thread: the next job to run, marked as current."""
+        self._queue_current = self.queue.jobs[0] if self.queue.jobs else None
+        self._refresh_queue_list()
+        return self._queue_current
+
+    def _queue_done(self, job):
+        """Tk thread: drop a finished job."""
+        self._queue_current = None
+        self.queue.remove(job)
+        self._refresh_queue_list()
+
+    def _queue_job(self, start_at, gap, countdown):
+        """Worker: run queued jobs one after another until the queue is
+        empty, a job fails or Stop is pressed."""
+        done = 0
+        try:
+            if start_at:
+                when = time.strftime("%H:%M", time.localtime(start_at))
+                self._log_msg("Queue scheduled to start at " + when, "accent")
+                self._status("Queue starts at " + when + " -- Stop cancels.",
+                             _t("ORANGE"))
+                if self.stop_event.wait(max(0.0, start_at - time.time())):
+                    self._log_msg("Queue cancelled.", "warn")
+                    return
+            while not self.stop_event.is_set():
+                job = self._ui_call(self._queue_next)
+                if job is None:
+                    break
+                if done and gap:
+                    self._status("Next job in " + str(gap) + "s...",
+                                 _t("CYAN"))
+                    if self.stop_event.wait(gap):
+                        break
+                self._log_msg("Queue job " + str(done + 1) + ": "
+                              + QueueManager.label(job), "cyan")
+                o = job["opts"]
+                opts = (o["trim"], o["skip_empty"])
+                try:
+                    if job["kind"] == "file":
+                        path = job["path"]
+                        text = self._make_source(path=path, opts=opts)
+                    else:
+                        path = None
+                        if job["kind"] == "preset":
+                            if job["preset"] not in self.presets.names():
+                                raise ValueError("preset " + job["preset"]
+                                                 + " no longer exists")
+                            raw = self.presets.get(job["preset"])
+                        else:
+                            raw = job["text"]
+                        text = self._make_source(raw, opts=opts)
+                except (OSError, ValueError) as exc:
+                    self._log_msg("Queue stopped: " + str(exc), "error")
+                    self._status("Queue stopped: job failed.", _t("RED"))
+                    break
+
+                self.pause_event.clear()
+                self._paused = False
+                self.error = None
+                self._typing = True
+                self.root.after(0, self._begin_typing_ui)
+                args = self._session_args(text, o, path,
+                                          countdown if not done else 0)
+                if self._engine_wanted(args[3]):
+                    self._engine_job(args)
+                else:
+                    self._type_job(*args)
+                if self.stop_event.is_set() or self.error is not None:
+                    break
+                self._ui_call(lambda j=job: self._queue_done(j))
+                done += 1
+            if self.queue.jobs:
+                self._log_msg("Queue stopped after " + str(done) + " job(s); "
+                              + str(len(self.queue.jobs)) + " left.", "warn")
+            else:
+                self._log_msg("Queue finished: " + str(done) + " job(s).",
+                              "success")
+        except Exception as exc:
+            self._log_msg("Queue error: " + str(exc), "error")
+        finally:
+            self._queue_active = False
+            self._queue_current = None
+            self.root.after(0, self._refresh_queue_list)
+            self.root.after(0, lambda: self._queue_run_btn.state(
+                ["!disabled"]))
+            self.root.after(0, lambda: self._start_btn.state(["!disabled"]))
+
+    def _make_source(self, text="", path=None, opts=None):
+        """Typing source for editor text or a file, with the line stages
+        for the enabled (trim, skip) options."""
+        trim, skip = opts or (self._trim_var.get(), self._skip_nl_var.get())
+        stages = []
+        if trim:
+            stages.append(trim_lines)
+        if skip:
+            stages.append(skip_empty_lines)
+        if path:
+            return FileSource(path, stages)
+        return TextSource(text, stages)
 
-                    pct = 5 + int(typed / total * 95)
-                    self._set_progress(pct)
+    def _before_countdown(self):
+        if self._minimize_var.get():
+            self.root.after(0, self.root.iconify)
 
-                    elapsed = time.time() - self._start_time
-                    remaining = (elapsed / typed) * (total - typed) if typed else 0
-                    self._set_elapsed(
-                        self._fmt_time(elapsed) + " / ~"
-                        + self._fmt_time(remaining) + " left")
-                    self._set_wpm(typed, elapsed)
+    def _notify_done(self):
+        if self._notify_var.get() and SYSTEM == "Windows":
+            try:
+                import winsound as ws
+                ws.MessageBeep(ws.MB_OK)
+            except Exception:
+                pass
 
-                    delay = self._calc_delay(ch, base_delay, mode, randomness)
-                    if delay > 0:
-                        time.sleep(delay)
+    def _read_clipboard(self):
+        return self._ui_call(self._clipboard_text)
 
-                if rep < repeat - 1:
-                    self._log_msg("Waiting 1s before next repeat...", "dim")
-                    time.sleep(1.0)
+    def _write_clipboard(self, text):
+        self._ui_call(lambda: self._set_clipboard(text))
 
-            elapsed = time.time() - self._start_time
-            self._set_progress(100)
-            msg = ("Done! " + str(typed) + " characters typed in "
-                   + self._fmt_time(elapsed) + ".")
-            self._finish(msg, _t("ACCENT2"), typed, mode, repeat)
+    def _ui_call(self, fn):
+        """Run fn on the Tk thread and return its result to the worker."""
+        done = threading.Event()
+        box = [None, None]
 
-            if self._notify_var.get() and SYSTEM == "Windows":
-                try:
-                    import winsound as ws
-                    ws.MessageBeep(ws.MB_OK)
-                except Exception:
-                    pass
+        def _do():
+            try:
+                box[0] = fn()
+            except Exception as exc:
+                box[1] = exc
+            finally:
+                done.set()
+        self.root.after(0, _do)
+        if not done.wait(5.0):
+            raise RuntimeError("UI thread not responding")
+        if box[1] is not None:
+            raise box[1]
+        return box[0]
 
-        except Exception as exc:
-            self._finish("Error: " + str(exc), _t("RED"), 0, mode, repeat)
+    def _clipboard_text(self):
+        try:
+            return self.root.clipboard_get()
+        except tk.TclError:
+            return None
 
-    def _calc_delay(self, ch, base, mode, rand_pct):
-        if mode == "normal":
-            return base
-        elif mode == "human":
-            variance = base * rand_pct
-            delay = base + random.uniform(-variance, variance)
-            if ch in ".!?":
-                delay += base * random.uniform(2, 5)
-            elif ch in ",;:":
-                delay += base * random.uniform(0.5, 2)
-            elif ch == "\n":
-                delay += base * random.uniform(1, 3)
-            elif ch == " ":
-                delay += base * random.uniform(0, 0.5)
-            return max(0, delay)
-        elif mode == "burst":
-            if not hasattr(self, "_burst_count"):
-                self._burst_count = 0
-                self._burst_size = random.randint(3, 8)
-            self._burst_count += 1
-            if self._burst_count >= self._burst_size:
-                self._burst_count = 0
-                self._burst_size = random.randint(3, 8)
-                return base * random.uniform(3, 7)
-            return base * 0.3
-        return base
+    def _set_clipboard(self, text):
+        self.root.clipboard_clear()
+        if text is not None:
+            self.root.clipboard_append(text)
+        self.root.update_idletasks()
 
     def _finish(self, msg, color, chars_typed=0, mode="", repeat=1):
         self._typing = False
         self._paused = False
-        tag = "success" if color == _t("ACCENT2") else "error"
+        ok = self.outcome == self.DONE
+        tag = "success" if ok else "error"
         self._status(msg, color)
         self._log_msg(msg, tag)
+        self._publish({"event": "finished", "text": msg,
+                       "ok": ok, "outcome": self.outcome,
+                       "chars": chars_typed,
+                       "error": str(self.error) if self.error is not None
+                       else None})
         self.root.after(0, lambda: self._start_btn.state(["!disabled"]))
         self.root.after(0, lambda: self._pause_btn.state(["disabled"]))
         self.root.after(0, lambda: self._pause_btn.configure(text="  Pause  "))
+        self.root.after(0, self._update_resume_btn)
         self.root.after(0, lambda: self._wpm_lbl.configure(text=""))
         self.root.after(0, lambda: self.root.title(
             "Automatic Writing Assistant v" + self.VERSION))
@@ -2549,7 +6282,9 @@ class App:
         # Record to history
         if chars_typed > 0:
             elapsed = time.time() - self._start_time
-            self.history.record(chars_typed, elapsed, mode, repeat)
+            self.history.record(chars_typed, elapsed, mode, repeat,
+                                self.latency.summary() if self.latency
+                                else None)
             self.root.after(0, self._refresh_stats_tab)
 
         if self._restore_var.get():
@@ -2557,10 +6292,213 @@ class App:
             self.root.after(100, self.root.lift)
 
 
+# ==================================================================
+# Headless Mode
+# ==================================================================
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_STOPPED = 3
+
+
+class HeadlessRunner(TypingRunner):
+    """Runs the typing worker without Tk, reporting to stderr."""
+
+    EXIT_CODES = {TypingRunner.DONE: EXIT_OK,
+                  TypingRunner.STOPPED: EXIT_STOPPED,
+                  TypingRunner.ERROR: EXIT_ERROR,
+                  TypingRunner.EMPTY: EXIT_USAGE}
+
+    def __init__(self, backend, quiet=False):
+        self._init_worker(backend)
+        self.quiet = quiet
+        self.history = HistoryManager()
+        self.result = EXIT_STOPPED
+        self._pct = self._pct_new = -1
+        self._elapsed = ""
+
+    def _status(self, msg, color=None):
+        pass  # the log carries the same information
+
+    def _log_msg(self, msg, tag="info"):
+        if not self.quiet or tag == "error":
+            sys.stderr.write(msg + "\n")
+            sys.stderr.flush()
+
+    def _set_progress(self, pct):
+        self._pct_new = pct
+
+    def _set_elapsed(self, text):
+        self._elapsed = text
+
+    def _set_wpm(self, chars, elapsed):
+        pct = self._pct_new
+        if pct == self._pct or self.quiet or elapsed <= 0:
+            return
+        self._pct = pct
+        sys.stderr.write("[" + str(pct).rjust(3) + "%] " + self._elapsed
+                         + " | " + str(int(chars / 5.0 / (elapsed / 60.0)))
+                         + " WPM\n")
+
+    def _finish(self, msg, color, chars_typed=0, mode="", repeat=1):
+        sys.stderr.write(msg + "\n")
+        self.result = self.EXIT_CODES[self.outcome]
+        if chars_typed > 0:
+            self.history.record(chars_typed, time.time() - self._start_time,
+                                mode, repeat,
+                                self.latency.summary() if self.latency
+                                else None)
+
+
+def run_headless(argv):
+    """Type a file or preset with the saved settings and no GUI.
+
+    Returns the exit code: 0 done, 1 error, 2 bad arguments, 3 stopped.
+    """
+    settings = AppSettings()
+    p = argparse.ArgumentParser(
+        prog="app.py --headless",
+        description="Type a file or preset into the focused window "
+                    "without the GUI. Options default to the saved "
+                    "settings.")
+    p.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--file", help="UTF-8 text file to type, - for stdin")
+    src.add_argument("--preset", help="name of a saved preset")
+    p.add_argument("--mode", choices=("normal", "human", "burst", "learned"))
+    p.add_argument("--delay", type=int, help="ms per character")
+    p.add_argument("--wpm", type=int,
+                   help="target words per minute, closed loop (0 = off)")
+    p.add_argument("--randomness", type=int, help="0-100 percent")
+    p.add_argument("--countdown", type=int, help="seconds before typing")
+    p.add_argument("--repeat", type=int)
+    p.add_argument("--seed", type=int, help="0 for unseeded")
+    p.add_argument("--trim", action=argparse.BooleanOptionalAction)
+    p.add_argument("--skip-empty", action=argparse.BooleanOptionalAction)
+    p.add_argument("--shift-enter", action=argparse.BooleanOptionalAction)
+    p.add_argument("--unicode", action=argparse.BooleanOptionalAction)
+    p.add_argument("--trace", action=argparse.BooleanOptionalAction,
+                   help="record a keystroke timing trace in traces/")
+    p.add_argument("--profile", action="store_true",
+                   help="profile the run (report in profiles/)")
+    p.add_argument("--quiet", action="store_true",
+                   help="only print errors and the result")
+    args = p.parse_args(argv)
+
+    def usage_error(msg):
+        p.print_usage(sys.stderr)
+        sys.stderr.write(p.prog + ": error: " + msg + "\n")
+        return EXIT_USAGE
+
+    def opt(value, key):
+        return settings[key] if value is None else value
+
+    mode = opt(args.mode, "mode")
+    delay_ms = max(1, opt(args.delay, "delay"))
+    randomness = opt(args.randomness, "randomness")
+    if not 0 <= randomness <= 100:
+        return usage_error(("--randomness" if args.randomness is not None
+                            else "the saved randomness setting")
+                           + " must be 0-100")
+    randomness /= 100.0
+    countdown = max(0, opt(args.countdown, "countdown"))
+    repeat = max(1, opt(args.repeat, "repeat"))
+    seed = opt(args.seed, "seed") or None
+    target_wpm = max(0, opt(args.wpm, "target_wpm"))
+    trim = opt(args.trim, "trim_trailing")
+    skip = opt(args.skip_empty, "skip_empty")
+    shift_enter = opt(args.shift_enter, "shift_enter")
+    unicode_only = opt(args.unicode, "unicode_only")
+
+    stages = []
+    if trim:
+        stages.append(trim_lines)
+    if skip:
+        stages.append(skip_empty_lines)
+    path = ""
+    try:
+        if args.preset is not None:
+            presets = PresetManager()
+            if args.preset not in presets.names():
+                return usage_error("no preset named " + repr(args.preset))
+            text = presets.get(args.preset)
+            source = TextSource(text, stages)
+        elif args.file == "-":
+            source = TextSource(sys.stdin.read(), stages)
+        else:
+            path = args.file
+            source = FileSource(path, stages)
+    except OSError as exc:
+        sys.stderr.write("Error: " + str(exc) + "\n")
+        return EXIT_USAGE
+    if not source.size:
+        sys.stderr.write("Error: nothing to type\n")
+        return EXIT_USAGE
+
+    try:
+        backend = _make_backend()
+    except Exception as exc:
+        sys.stderr.write("Error: no typing backend: " + str(exc) + "\n")
+        return EXIT_ERROR
+    backend.shift_enter = shift_enter
+    backend.unicode_only = backend.unicode_supported and unicode_only
+
+    runner = HeadlessRunner(backend, args.quiet)
+    runner.key_costs = KeyCosts(
+        settings["backend_costs"].get(type(backend).__name__))
+    runner.trace_keys = opt(args.trace, "trace")
+    if mode == "paste":
+        runner._log_msg("Instant mode needs the GUI clipboard; typing in"
+                        " Constant mode.", "warn")
+        mode = "normal"
+    runner._log_msg("Typing " + (os.path.basename(path) if path
+                                 else "preset " + repr(args.preset)
+                                 if args.preset is not None else "stdin")
+                    + " | Mode: " + mode + " | Delay: "
+                    + (str(target_wpm) + " WPM" if target_wpm
+                       else str(delay_ms) + "ms")
+                    + " | Repeat: " + str(repeat) + "x | Backend: "
+                    + type(backend).__name__)
+    ck = {"key": source.digest(), "path": path, "rep": 0, "offset": 0,
+          "mode": mode, "delay": delay_ms,
+          "randomness": int(randomness * 100), "repeat": repeat,
+          "seed": seed or 0, "target_wpm": target_wpm,
+          "trim": trim, "skip_empty": skip,
+          "shift_enter": shift_enter, "unicode_only": unicode_only,
+          "paste_chunk": settings["paste_chunk"],
+          "paste_delay": settings["paste_delay"]}
+    cache_opts = (shift_enter, unicode_only)
+    job = runner._type_job
+    job_args = (source, countdown, delay_ms / 1000.0, mode, randomness,
+                repeat, cache_opts, (), seed, ck, target_wpm)
+    if args.profile:
+        job, job_args = runner._profiled, ("typing session", job) + job_args
+    worker = threading.Thread(target=job, args=job_args, daemon=True)
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(0.25)
+    except KeyboardInterrupt:
+        runner._stop_at = time.perf_counter()
+        runner.stop_event.set()
+        worker.join()
+    backend.shutdown()
+    return runner.result
+
+
 # ==================================================================
 # Main
 # ==================================================================
 def main():
+    if "--headless" in sys.argv[1:]:
+        sys.exit(run_headless(sys.argv[1:]))
+
+    prof = None
+    settings = AppSettings()
+    if settings["profile"] and settings["profile_target"] == "Startup":
+        prof = SessionProfiler("startup")
+        prof.start()
+
     root = tk.Tk()
     root.withdraw()
 
@@ -2600,6 +6538,10 @@ def main():
         return
 
     app = App(root, backend)
+    if prof is not None:
+        root.update_idletasks()
+        app._prof_var.set(False)
+        app._profile_done(prof)
 
     # Window geometry from settings
     w = app.settings["win_w"]
@@ -2618,4 +6560,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,230 @@
+"""Micro-benchmarks for the typing engine.
+
+Drives TypingRunner._type_job through a RecordingBackend, so nothing is
+sent to the OS: the numbers are the cost of the typing loop itself
+(planning, scheduling, progress reporting).  Results are written as
+JSON; pass --compare with an earlier file to see the change.
+
+    python bench_typing.py
+    python bench_typing.py --quick --out new.json --compare old.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import app
+
+MODES = ("normal", "human", "burst", "learned", "paste")
+SIZES = (1000, 10000, 100000)
+QUICK_SIZES = (1000, 10000)
+DELAYS_MS = (1, 5, 20)
+DELAY_CHARS = 200
+RUNS = 3        # throughput cases keep the best of this many runs
+
+# Character pools for the Unicode mixes
+ASCII = "abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ 0123456789 .,;:!?\n"
+LATIN = "àáâäçèéêëìíîïñòóôöùúûüÿßøåæœ€"
+WIDE = "你好世界日本語한국어😀🚀👍🎉"
+MIXES = {
+    "ascii": (ASCII, 0.0),
+    "latin": (LATIN, 0.15),
+    "cjk_emoji": (WIDE, 0.15),
+}
+
+
+def make_text(size, mix, seed=1):
+    pool, share = MIXES[mix]
+    rng = random.Random(seed)
+    return "".join(rng.choice(pool) if rng.random() < share
+                   else rng.choice(ASCII) for _ in range(size))
+
+
+class BenchRunner(app.TypingRunner):
+    """A TypingRunner whose progress sink only counts UI callbacks."""
+
+    def __init__(self):
+        self._init_worker(app.RecordingBackend())
+        self.clipboard = None
+        self.ui_calls = 0
+        self.result = ""
+
+    # Each of these is one root.after() in the GUI
+    def _status(self, msg, color=None):
+        self.ui_calls += 1
+
+    def _log_msg(self, msg, tag="info"):
+        self.ui_calls += 1
+
+    def _set_progress(self, pct):
+        self.ui_calls += 1
+
+    def _set_elapsed(self, text):
+        self.ui_calls += 1
+
+    def _set_wpm(self, chars, elapsed):
+        self.ui_calls += 1
+
+    def _finish(self, msg, color, chars_typed=0, mode="", repeat=1):
+        self.ui_calls += 1
+        self.result = msg
+
+    def _read_clipboard(self):
+        return self.clipboard
+
+    def _write_clipboard(self, text):
+        self.clipboard = text
+
+
+def train_bigrams(bg):
+    """Give the learned mode a synthetic but stable timing model."""
+    rng = random.Random(7)
+    for _ in range(5000):
+        a, b = rng.choice(ASCII), rng.choice(ASCII)
+        bg.add(a, b, 0.05 + rng.random() * 0.1)
+    bg._build()
+
+
+def run_case(text, mode, delay_ms):
+    runner = BenchRunner()
+    if mode == "learned":
+        train_bigrams(runner.bigrams)
+    source = app.TextSource(text)
+    cache_opts = (True, False)     # shift_enter, unicode_only
+    t0 = time.perf_counter()
+    runner._type_job(source, 0, delay_ms / 1000.0, mode, 0.3, 1,
+                     cache_opts, (200, delay_ms / 1000.0), 1)
+    wall = time.perf_counter() - t0
+    rec = runner.backend
+    if runner.error is not None:
+        raise RuntimeError(f"{mode}: {runner.error}")
+    if mode != "paste" and rec.text() != text.rstrip("\n"):
+        raise RuntimeError(f"{mode}: typed text does not match")
+    return runner, wall
+
+
+def bench_throughput(sizes):
+    results = []
+    for mix in MIXES:
+        for size in sizes:
+            text = make_text(size, mix)
+            for mode in MODES:
+                runner, wall = min((run_case(text, mode, 0)
+                                    for _ in range(RUNS)),
+                                   key=lambda r: r[1])
+                n = len(text.rstrip("\n"))
+                times = runner.backend.times
+                loop = times[-1] - times[0] if len(times) > 1 else 0.0
+                row = {
+                    "mix": mix, "size": size, "mode": mode,
+                    "wall_s": round(wall, 6),
+                    "chars_per_s": round(n / wall, 1),
+                    "overhead_us_per_char": round(wall / n * 1e6, 3),
+                    "loop_us_per_step": round(
+                        loop / max(1, len(times) - 1) * 1e6, 3),
+                    "ui_callbacks": runner.ui_calls,
+                    "ui_callbacks_per_char": round(runner.ui_calls / n, 3),
+                }
+                results.append(row)
+                print(f"  {mix:9} {size:>7} {mode:8} "
+                      f"{row['chars_per_s']:>12,.0f} c/s "
+                      f"{row['overhead_us_per_char']:>8.2f} us/char "
+                      f"{row['ui_callbacks_per_char']:>6.2f} ui/char",
+                      file=sys.stderr)
+    return results
+
+
+def bench_delay(delays):
+    """Achieved vs requested inter-key delay in Constant mode."""
+    results = []
+    text = make_text(DELAY_CHARS, "ascii")
+    for delay_ms in delays:
+        runner, wall = run_case(text, "normal", delay_ms)
+        times = runner.backend.times
+        gaps = sorted((times[i + 1] - times[i]) * 1000.0
+                      for i in range(len(times) - 1))
+        mean = sum(gaps) / len(gaps)
+        row = {
+            "requested_ms": delay_ms,
+            "achieved_mean_ms": round(mean, 4),
+            "error_pct": round((mean - delay_ms) / delay_ms * 100.0, 3),
+            "p50_ms": round(gaps[len(gaps) // 2], 4),
+            "p99_ms": round(gaps[int(len(gaps) * 0.99)], 4),
+            "max_ms": round(gaps[-1], 4),
+        }
+        results.append(row)
+        print(f"  {delay_ms:>3} ms requested: {row['achieved_mean_ms']:.3f} "
+              f"mean, {row['p99_ms']:.3f} p99 ({row['error_pct']:+.2f}%)",
+              file=sys.stderr)
+    return results
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip()
+    except Exception:
+        return ""
+
+
+def compare(old, new):
+    """Print the chars/s change per throughput case."""
+    before = {(r["mix"], r["size"], r["mode"]): r
+              for r in old.get("throughput", [])}
+    print("\nchars/s vs " + (old.get("commit") or "previous run") + ":")
+    for r in new["throughput"]:
+        o = before.get((r["mix"], r["size"], r["mode"]))
+        if o:
+            change = (r["chars_per_s"] / o["chars_per_s"] - 1.0) * 100.0
+            print(f"  {r['mix']:9} {r['size']:>7} {r['mode']:8} "
+                  f"{o['chars_per_s']:>12,.0f} -> {r['chars_per_s']:>12,.0f}"
+                  f" ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the typing engine.")
+    parser.add_argument("--out", default="bench_results.json",
+                        help="JSON file to write (default: %(default)s)")
+    parser.add_argument("--compare", help="earlier JSON result to compare with")
+    parser.add_argument("--quick", action="store_true",
+                        help="smaller texts, for a fast check")
+    args = parser.parse_args()
+
+    # Keep the plan cache, checkpoints and timing model out of the app dir
+    with tempfile.TemporaryDirectory() as tmp:
+        app.PLAN_CACHE_DIR = os.path.join(tmp, "plancache")
+        app.CHECKPOINT_FILE = os.path.join(tmp, "checkpoint.json")
+        app.BIGRAM_FILE = os.path.join(tmp, "bigrams.bin")
+
+        print("Throughput (zero delay):", file=sys.stderr)
+        throughput = bench_throughput(QUICK_SIZES if args.quick else SIZES)
+        print("Delay accuracy:", file=sys.stderr)
+        delay = bench_delay(DELAYS_MS[:2] if args.quick else DELAYS_MS)
+
+    result = {
+        "version": app.App.VERSION,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "throughput": throughput,
+        "delay": delay,
+    }
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(result, fh, indent=2)
+    print(f"Results: {args.out}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            compare(json.load(fh), result)
+
+
+if __name__ == "__main__":
+    main()
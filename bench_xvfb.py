@@ -0,0 +1,438 @@
+"""End-to-end typing benchmark on a virtual X server (Linux).
+
+Starts Xvfb and a plain Tk Text (or Entry) window in a child process,
+then types into it with every available Linux backend at each speed
+preset.  The window reports what it actually received, so the numbers
+include the X server and the toolkit: received chars/s, dropped, extra
+and reordered characters, and the latency of the Stop button and of
+the F9 hotkey.  Exits non-zero if any run's text did not match, so it
+can gate backend changes.
+
+    python bench_xvfb.py
+    python bench_xvfb.py --backend xtest --chars 200 --out xvfb.json
+
+Needs Xvfb on PATH (apt install xvfb), libXtst, and pynput for the
+pynput backend.
+"""
+import argparse
+import collections
+import difflib
+import json
+import os
+import platform
+import queue
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Same delays as the Speed Presets buttons in the Settings tab
+PRESETS = (("Slow", 80), ("Normal", 30), ("Fast", 15), ("Blazing", 5))
+BACKENDS = ("xtest", "pynput")
+STOP_RUNS = 5
+STOP_AFTER = 0.3    # seconds of typing before a stop is requested
+
+ASCII = "abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ 0123456789 .,;:!?'\"()-"
+LATIN = "àáâäçèéêëìíîïñòóôöùúûüÿßøåæ"
+
+
+def make_text(size, mix, newlines, seed=1):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(size):
+        if newlines and rng.random() < 0.03:
+            out.append("\n")
+        elif mix == "latin" and rng.random() < 0.15:
+            out.append(rng.choice(LATIN))
+        else:
+            out.append(rng.choice(ASCII))
+    return "".join(out).strip("\n")
+
+
+# ------------------------------------------------------------------
+# Target window (runs in its own process, talks JSON lines on stdio)
+# ------------------------------------------------------------------
+def run_target(widget):
+    import tkinter as tk
+
+    root = tk.Tk()
+    root.title("bench target")
+    root.geometry("800x600+0+0")
+    if widget == "entry":
+        box = tk.Entry(root)
+        box.pack(fill="x")
+    else:
+        box = tk.Text(root, undo=False)
+        box.pack(fill="both", expand=True)
+    keys = []            # time.perf_counter() of each key press
+
+    def on_key(event):
+        if event.char or event.keysym == "Return":
+            keys.append(time.perf_counter())
+    box.bind("<KeyPress>", on_key, add="+")
+
+    def content():
+        if widget == "entry":
+            return box.get()
+        return box.get("1.0", "end-1c")
+
+    def reply(**kw):
+        sys.stdout.write(json.dumps(kw) + "\n")
+        sys.stdout.flush()
+
+    commands = queue.Queue()
+
+    def reader():
+        for line in sys.stdin:
+            commands.put(line.strip())
+        commands.put("quit")
+
+    def poll():
+        while True:
+            try:
+                cmd = commands.get_nowait()
+            except queue.Empty:
+                break
+            if cmd == "focus":
+                root.lift()
+                root.focus_force()
+                box.focus_set()
+                root.update()
+                reply(ok=root.focus_get() is box)
+            elif cmd == "clear":
+                if widget == "entry":
+                    box.delete(0, "end")
+                else:
+                    box.delete("1.0", "end")
+                del keys[:]
+                reply(ok=True)
+            elif cmd == "dump":
+                reply(text=content(), keys=len(keys),
+                      first=keys[0] if keys else 0.0,
+                      last=keys[-1] if keys else 0.0)
+            elif cmd == "quit":
+                root.destroy()
+                return
+        root.after(5, poll)
+
+    threading.Thread(target=reader, daemon=True).start()
+    root.after(50, poll)
+    reply(ready=True)
+    root.mainloop()
+
+
+class Target:
+    """The parent's handle on the target window process."""
+
+    def __init__(self, widget):
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--target", widget],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        self.read()
+
+    def read(self):
+        line = self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError("Target window exited")
+        return json.loads(line)
+
+    def call(self, cmd):
+        self.proc.stdin.write(cmd + "\n")
+        self.proc.stdin.flush()
+        return self.read()
+
+    def settle(self, expected_len, timeout=5.0):
+        """Dump once the text has stopped changing (or is complete)."""
+        last, since = None, time.perf_counter()
+        deadline = since + timeout
+        while True:
+            got = self.call("dump")
+            now = time.perf_counter()
+            if len(got["text"]) >= expected_len or now > deadline:
+                return got
+            if got["text"] != last:
+                last, since = got["text"], now
+            elif now - since > 0.5:
+                return got
+            time.sleep(0.05)
+
+    def close(self):
+        try:
+            self.call("quit")
+        except Exception:
+            pass
+        try:
+            self.proc.wait(5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+# ------------------------------------------------------------------
+# Virtual X server
+# ------------------------------------------------------------------
+def start_xvfb():
+    """Start Xvfb on the first free display; returns (proc, display)."""
+    exe = shutil.which("Xvfb")
+    if not exe:
+        raise RuntimeError("Xvfb not found (apt install xvfb)")
+    for n in range(90, 140):
+        if os.path.exists("/tmp/.X11-unix/X" + str(n)) \
+                or os.path.exists("/tmp/.X" + str(n) + "-lock"):
+            continue
+        display = ":" + str(n)
+        proc = subprocess.Popen(
+            [exe, display, "-screen", "0", "1024x768x24", "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            if proc.poll() is not None:
+                break
+            if os.path.exists("/tmp/.X11-unix/X" + str(n)):
+                return proc, display
+            time.sleep(0.05)
+        proc.kill()
+    raise RuntimeError("Could not start Xvfb")
+
+
+def press_f9():
+    """Press and release F9 through XTest on a connection of our own."""
+    import app
+    x11, xtst = app._load_xlib()
+    dpy = x11.XOpenDisplay(None)
+    try:
+        kc = x11.XKeysymToKeycode(dpy, 0xFFC6)
+        t0 = time.perf_counter()
+        xtst.XTestFakeKeyEvent(dpy, kc, 1, 0)
+        x11.XFlush(dpy)
+        time.sleep(0.02)
+        xtst.XTestFakeKeyEvent(dpy, kc, 0, 0)
+        x11.XFlush(dpy)
+        return t0
+    finally:
+        x11.XCloseDisplay(dpy)
+
+
+# ------------------------------------------------------------------
+# Runs
+# ------------------------------------------------------------------
+def make_runner(backend_name):
+    import app
+
+    class BenchRunner(app.TypingRunner):
+        """A TypingRunner that keeps only the outcome of a job."""
+
+        def __init__(self, backend):
+            self._init_worker(backend)
+            self.finished_at = 0.0
+            self.result = ""
+            self.warnings = []
+
+        def _status(self, msg, color=None):
+            pass
+
+        def _log_msg(self, msg, tag="info"):
+            if tag == "warn" and not msg.startswith("Countdown"):
+                self.warnings.append(msg.strip())
+
+        def _set_progress(self, pct):
+            pass
+
+        def _set_elapsed(self, text):
+            pass
+
+        def _set_wpm(self, chars, elapsed):
+            pass
+
+        def _finish(self, msg, color, chars_typed=0, mode="", repeat=1):
+            self.finished_at = time.perf_counter()
+            self.result = msg
+
+    if backend_name == "xtest":
+        backend = app.XTestBackend()
+    else:
+        backend = app.PynputBackend()
+    backend.shift_enter = False
+    return BenchRunner(backend), app
+
+
+def compare_text(expected, got):
+    """Count dropped, extra and reordered characters."""
+    missing = collections.Counter(expected) - collections.Counter(got)
+    extra = collections.Counter(got) - collections.Counter(expected)
+    sm = difflib.SequenceMatcher(None, expected, got, autojunk=False)
+    in_order = sum(b.size for b in sm.get_matching_blocks())
+    dropped = sum(missing.values())
+    # Present in both texts, but not where they were typed
+    reordered = len(expected) - dropped - in_order
+    return dropped, sum(extra.values()), reordered
+
+
+def run_speed(runner, app, target, text, preset, delay_ms, mix):
+    target.call("clear")
+    focused = target.call("focus")["ok"]
+    source = app.TextSource(text)
+    t0 = time.perf_counter()
+    runner._type_job(source, 0, delay_ms / 1000.0, "normal", 0.0, 1,
+                     (False, False))
+    if runner.error is not None:
+        raise RuntimeError(str(runner.error))
+    wall = runner.finished_at - t0
+    got = target.settle(len(text))
+    received = got["text"]
+    dropped, extra, reordered = compare_text(text, received)
+    span = got["last"] - got["first"]
+    return {
+        "preset": preset, "delay_ms": delay_ms, "mix": mix,
+        "chars": len(text),
+        "received": len(received),
+        "match": received == text,
+        "focused": focused,
+        "target_chars_per_s": round(len(text) / (delay_ms / 1000.0), 1),
+        "sent_chars_per_s": round(len(text) / wall, 1) if wall else 0.0,
+        "received_chars_per_s": (round((got["keys"] - 1) / span, 1)
+                                 if span > 0 else 0.0),
+        "dropped": dropped, "extra": extra, "reordered": reordered,
+        "warnings": runner.warnings[:],
+    }
+
+
+def run_stop(runner, app, target, text, how):
+    """Latency from a stop request to the worker giving up."""
+    samples = []
+    for _ in range(STOP_RUNS):
+        target.call("clear")
+        target.call("focus")
+        runner.stop_event.clear()
+        source = app.TextSource(text)
+        worker = threading.Thread(
+            target=runner._type_job,
+            args=(source, 0, 0.03, "normal", 0.0, 1,
+                  (False, False)))
+        worker.start()
+        time.sleep(STOP_AFTER)
+        if how == "hotkey":
+            t0 = press_f9()
+        else:
+            t0 = runner._stop_at = time.perf_counter()
+            runner.stop_event.set()
+        worker.join(10)
+        if worker.is_alive() or not runner.result.startswith("Stopped"):
+            runner.stop_event.set()
+            worker.join(10)
+            samples.append(None)
+            continue
+        samples.append((runner.finished_at - t0) * 1000.0)
+        runner._stop_at = 0.0
+    ok = sorted(s for s in samples if s is not None)
+    return {
+        "how": how,
+        "runs": len(samples),
+        "missed": len(samples) - len(ok),
+        "median_ms": round(ok[len(ok) // 2], 3) if ok else None,
+        "max_ms": round(ok[-1], 3) if ok else None,
+    }
+
+
+def bench_backend(name, target, args):
+    try:
+        runner, app = make_runner(name)
+    except Exception as exc:
+        print(f"  {name}: unavailable ({exc})", file=sys.stderr)
+        return {"backend": name, "error": str(exc)}
+    newlines = args.widget == "text"
+    speeds = []
+    stops = []
+    try:
+        for mix in args.mix:
+            text = make_text(args.chars, mix, newlines)
+            for preset, delay_ms in PRESETS:
+                row = run_speed(runner, app, target, text, preset, delay_ms,
+                                mix)
+                speeds.append(row)
+                print(f"  {name:7} {preset:8} {mix:6} "
+                      f"{row['received_chars_per_s']:>7.1f} c/s received "
+                      f"(target {row['target_chars_per_s']:.1f})  "
+                      f"dropped {row['dropped']}, extra {row['extra']}, "
+                      f"reordered {row['reordered']}"
+                      + ("" if row["match"] else "  MISMATCH"),
+                      file=sys.stderr)
+        long_text = make_text(2000, "ascii", newlines)
+        for how in ("button", "hotkey"):
+            row = run_stop(runner, app, target, long_text, how)
+            stops.append(row)
+            print(f"  {name:7} stop by {how:6}: median "
+                  f"{row['median_ms']} ms, max {row['max_ms']} ms, "
+                  f"{row['missed']} missed", file=sys.stderr)
+    finally:
+        runner.backend.shutdown()
+    return {"backend": name, "speeds": speeds, "stop": stops}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Linux backends end to end under Xvfb.")
+    parser.add_argument("--target", help=argparse.SUPPRESS)
+    parser.add_argument("--backend", choices=BACKENDS, action="append",
+                        help="backend to run (default: all available)")
+    parser.add_argument("--widget", choices=("text", "entry"), default="text",
+                        help="target widget (default: %(default)s; Entry "
+                             "texts have no newlines)")
+    parser.add_argument("--chars", type=int, default=400,
+                        help="characters per run (default: %(default)s)")
+    parser.add_argument("--mix", choices=("ascii", "latin"), action="append",
+                        help="character mix (default: ascii)")
+    parser.add_argument("--out", default="bench_xvfb.json",
+                        help="JSON file to write (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.target:
+        run_target(args.target)
+        return 0
+    if platform.system() != "Linux":
+        print("bench_xvfb.py needs Linux.", file=sys.stderr)
+        return 2
+    args.backend = args.backend or list(BACKENDS)
+    args.mix = args.mix or ["ascii"]
+
+    xvfb, display = start_xvfb()
+    os.environ["DISPLAY"] = display
+    target = None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            import app
+            app.PLAN_CACHE_DIR = os.path.join(tmp, "plancache")
+            app.CHECKPOINT_FILE = os.path.join(tmp, "checkpoint.json")
+            app.BIGRAM_FILE = os.path.join(tmp, "bigrams.bin")
+            target = Target(args.widget)
+            print("Xvfb " + display + ", " + args.widget + " target:",
+                  file=sys.stderr)
+            results = [bench_backend(name, target, args)
+                       for name in args.backend]
+    finally:
+        if target is not None:
+            target.close()
+        xvfb.terminate()
+        xvfb.wait(5)
+
+    result = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "widget": args.widget,
+        "chars": args.chars,
+        "backends": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(result, fh, indent=2)
+    print(f"Results: {args.out}", file=sys.stderr)
+
+    ran = [r for r in results if "speeds" in r]
+    failed = [s for r in ran for s in r["speeds"] if not s["match"]]
+    return 1 if failed or not ran else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+import os
+import threading
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def app_dir(tmp_path, monkeypatch):
+    """Keep checkpoints, caches and traces of the run out of the app dir."""
+    for name, fname in (("HISTORY_FILE", "history.json"),
+                        ("SETTINGS_FILE", "settings.json"),
+                        ("CHECKPOINT_FILE", "checkpoint.json"),
+                        ("BIGRAM_FILE", "bigrams.bin"),
+                        ("PLAN_CACHE_DIR", "plancache"),
+                        ("TRACE_DIR", "traces")):
+        monkeypatch.setattr(app, name, str(tmp_path / fname))
+    return tmp_path
+
+
+TEXTS = [
+    "",
+    "\n\n",
+    "one line",
+    "  lead\ntrail   \n\n   \n\tmid\t\nend  \n\n",
+    "a\n\n\nb  \n  \n" * 7 + "last",
+    "héllo wörld  \n€uro\n\n  ünïcode  \n" * 5,
+]
+
+STAGES = [
+    (),
+    (app.trim_lines,),
+    (app.skip_empty_lines,),
+    (app.trim_lines, app.skip_empty_lines),
+]
+
+
+def old_filter(text, stages):
+    """The str.split/rstrip filtering the stages replaced."""
+    text = text.rstrip("\n")
+    if app.trim_lines in stages:
+        text = "\n".join(line.rstrip() for line in text.split("\n"))
+    if app.skip_empty_lines in stages:
+        text = "\n".join(l for l in text.split("\n") if l.strip())
+    return text
+
+
+@pytest.mark.parametrize("block", [1, 3, 7, 1 << 16])
+@pytest.mark.parametrize("stages", STAGES)
+@pytest.mark.parametrize("text", TEXTS)
+def test_text_source_matches_old_filtering(monkeypatch, text, stages, block):
+    monkeypatch.setattr(app.TextSource, "BLOCK", block)
+    src = app.TextSource(text, stages)
+    assert "".join(src.blocks()) == old_filter(text, stages)
+
+
+@pytest.mark.parametrize("block", [1, 3, 7, 1 << 16])
+@pytest.mark.parametrize("stages", STAGES)
+@pytest.mark.parametrize("text", TEXTS)
+def test_file_source_crlf_matches_old_filtering(tmp_path, monkeypatch, text,
+                                                stages, block):
+    monkeypatch.setattr(app.TextSource, "BLOCK", block)
+    path = tmp_path / "text.txt"
+    path.write_bytes(text.replace("\n", "\r\n").encode("utf-8"))
+    src = app.FileSource(str(path), stages)
+    assert "".join(src.blocks()) == old_filter(text, stages)
+
+
+def test_digest_refuses_changed_text(tmp_path):
+    stages = (app.trim_lines,)
+    base = app.TextSource("some text", stages).digest()
+    assert app.TextSource("some text", stages).digest() == base
+    assert app.TextSource("some test", stages).digest() != base
+    assert app.TextSource("some text").digest() != base
+
+    path = tmp_path / "text.txt"
+    path.write_text("some text", encoding="utf-8")
+    before = app.FileSource(str(path), stages).digest()
+    path.write_text("some text, longer", encoding="utf-8")
+    assert app.FileSource(str(path), stages).digest() != before
+
+
+def test_checkpoint_save_load_clear(app_dir):
+    ck = app.CheckpointManager()
+    assert ck.load() is None
+    data = {"rep": 1, "offset": 42, "digest": "abc"}
+    ck.save(data)
+    assert ck.load() == data
+    assert not os.path.exists(app.CHECKPOINT_FILE + ".tmp")
+    ck.clear()
+    assert ck.load() is None
+    ck.clear()   # clearing twice is harmless
+
+
+class QuietRunner(app.TypingRunner):
+    """Runs _type_job into a RecordingBackend and keeps the outcome."""
+
+    def __init__(self):
+        self._init_worker(app.RecordingBackend())
+
+    def _status(self, msg, color=None):
+        pass
+
+    def _log_msg(self, msg, tag="info"):
+        pass
+
+    def _set_progress(self, pct):
+        pass
+
+    def _set_elapsed(self, text):
+        pass
+
+    def _set_wpm(self, chars, elapsed):
+        pass
+
+    def _finish(self, msg, color, chars_typed=0, mode="", repeat=1):
+        self.typed = chars_typed
+
+
+@pytest.mark.parametrize("offset", [0, 1, 6, 7, 8, 15, 23])
+def test_resume_at_offset_with_stages(app_dir, monkeypatch, offset):
+    monkeypatch.setattr(app.TextSource, "BLOCK", 7)
+    text = "ab  \n\n  cd\n   \nefg  \nhij\n\n\nklmnop   \nq"
+    stages = (app.trim_lines, app.skip_empty_lines)
+    expected = old_filter(text, stages)
+    assert offset <= len(expected)
+
+    runner = QuietRunner()
+    runner._type_job(app.TextSource(text, stages), 0, 0.0, "normal", 0.0, 1,
+                     ck={"rep": 0, "offset": offset})
+    assert runner.outcome == app.TypingRunner.DONE
+    # No character typed twice, none skipped
+    assert runner.backend.text() == expected[offset:]
+
+
+def test_plan_cache_round_trip_and_layout_miss(app_dir):
+    cache = app.PlanCache()
+    plan = app.KeystrokePlan("aB", "us")
+    plan.vk.extend([0x41, 0x10, 0x42])
+    plan.scan.extend([30, 42, 48])
+    plan.flags.extend([0, 0, 0])
+    plan.offsets.extend([1, 3])
+    plan.mods.extend([0, app.MOD_SHIFT])
+    plan.unmapped = 1
+
+    key = cache.key("aB", "us", "PlanBackend", False, False)
+    assert cache.load(key, "aB") is None
+    cache.store(key, plan)
+    got = cache.load(key, "aB")
+    assert got is not None
+    assert (got.text, got.layout, got.unmapped) == ("aB", "us", 1)
+    for name in ("vk", "scan", "flags", "offsets", "mods"):
+        assert getattr(got, name) == getattr(plan, name)
+
+    other = cache.key("aB", "de", "PlanBackend", False, False)
+    assert other != key
+    assert cache.load(other, "aB") is None
+    assert cache.key("aB", "us", "PlanBackend", True, False) != key
+
+
+@pytest.mark.parametrize("mode", ["normal", "human", "burst"])
+def test_delay_engine_same_seed_same_schedule(mode):
+    text = "Hello, world. Typing in bursts; then a pause!\n" * 4
+
+    def schedules(seed):
+        engine = app.DelayEngine(mode, 0.05, 0.3, seed)
+        return [engine.schedule(text[i:i + 13])
+                for i in range(0, len(text), 13)]
+
+    assert schedules(7) == schedules(7)
+    if mode != "normal":
+        assert schedules(7) != schedules(8)
+
+
+def test_keystroke_trace_save_load(tmp_path):
+    trace = app.KeystrokeTrace(8, {"mode": "normal", "chars": 3})
+    for i in range(3):
+        trace.add(i * 0.01, i * 0.01 + 0.0005 * i, 0.0001 * (i + 1))
+    path = str(tmp_path / "run.trace")
+    trace.save(path)
+
+    got = app.KeystrokeTrace.load(path)
+    assert got.n == 3
+    assert got.meta == trace.meta
+    assert got.dropped == 0
+    assert got.summary() == trace.summary()
+    assert list(got.lateness()) == list(trace.lateness())
+
+    with open(path, "r+b") as fh:
+        fh.write(b"XXXX")
+    with pytest.raises(ValueError):
+        app.KeystrokeTrace.load(path)
+
+
+def test_keystroke_trace_replay_follows_timeline():
+    trace = app.KeystrokeTrace(40)
+    for i in range(40):
+        t = (i + 1) * 0.002
+        trace.add(t, t, 0.0)
+    backend = app.RecordingBackend()
+    rep = trace.replay(backend)
+
+    assert rep.n == trace.n
+    assert backend.text() == " " * trace.n
+    assert list(rep.planned[:rep.n]) == pytest.approx(
+        list(trace.planned[:trace.n]))
+    # Generous for loaded machines; the scheduler itself spins to <1 ms
+    assert rep.summary()["late_p50"] < 5.0
+
+
+def test_keystroke_trace_replay_stops():
+    trace = app.KeystrokeTrace(10)
+    for i in range(10):
+        trace.add(i * 0.5, i * 0.5, 0.0)
+    stop = threading.Event()
+    stop.set()
+    assert trace.replay(app.RecordingBackend(), stop).n == 0
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def app_dir(tmp_path, monkeypatch):
+    """Keep settings, history and caches of the run out of the app dir."""
+    for name, fname in (("HISTORY_FILE", "history.json"),
+                        ("SETTINGS_FILE", "settings.json"),
+                        ("CHECKPOINT_FILE", "checkpoint.json"),
+                        ("BIGRAM_FILE", "bigrams.bin"),
+                        ("PLAN_CACHE_DIR", "plancache"),
+                        ("TRACE_DIR", "traces")):
+        monkeypatch.setattr(app, name, str(tmp_path / fname))
+    monkeypatch.setenv("AWA_BACKEND", "record")
+    return tmp_path
+
+
+def test_headless_history_has_latency(app_dir):
+    src = app_dir / "text.txt"
+    src.write_text("hello headless world\n", encoding="utf-8")
+    code = app.run_headless(["--headless", "--file", str(src),
+                             "--countdown", "0", "--delay", "2", "--quiet"])
+    assert code == app.EXIT_OK
+
+    with open(app_dir / "history.json", encoding="utf-8") as fh:
+        entry = json.load(fh)["sessions"][-1]
+    assert entry["chars"] == len("hello headless world")
+    for key in ("p50", "p95", "p99", "stall", "cps", "target_cps"):
+        assert key in entry
+    assert entry["target_cps"] == pytest.approx(500.0)
+
+
+def run(path, *extra):
+    return app.run_headless(["--headless", "--file", str(path),
+                             "--countdown", "0", "--delay", "1", "--quiet",
+                             *extra])
+
+
+def test_headless_empty_after_filtering_is_usage_error(app_dir):
+    src = app_dir / "text.txt"
+    src.write_text("  \n\n  \nend", encoding="utf-8")
+    blank = app_dir / "blank.txt"
+    blank.write_text("\n  \n", encoding="utf-8")
+    assert run(blank, "--skip-empty", "--trim") == app.EXIT_USAGE
+    assert run(src, "--skip-empty", "--trim") == app.EXIT_OK
+
+
+def test_headless_bad_options_return_usage(app_dir, capsys):
+    src = app_dir / "text.txt"
+    src.write_text("abc", encoding="utf-8")
+    assert run(src, "--randomness", "150") == app.EXIT_USAGE
+    assert "--randomness must be 0-100" in capsys.readouterr().err
+    code = app.run_headless(["--headless", "--preset", "missing",
+                             "--countdown", "0", "--quiet"])
+    assert code == app.EXIT_USAGE